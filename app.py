@@ -11,47 +11,88 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import asyncio
+import contextlib
+import hashlib
+import importlib.util
 import sys
-import threading
-import time
 import webbrowser
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import Response
 
 from web.api import router as api_router, ensure_cleanup_task_started
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI):
+async def lifespan(app: FastAPI):
     ensure_cleanup_task_started()
+
+    browser_task = None
+    port = getattr(app.state, "open_browser_port", None)
+    if port:
+        browser_task = asyncio.create_task(open_browser(port))
+
     yield
 
+    if browser_task is not None and not browser_task.done():
+        browser_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await browser_task
+
 
 app = FastAPI(title="rednote-content-studio", docs_url="/docs", lifespan=lifespan)
 
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Mount API routes
 app.include_router(api_router)
 
+
+class RevalidatedStaticFiles(StaticFiles):
+    """Static files that browsers may cache but must revalidate (asset names are not hashed)."""
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        response.headers.setdefault("Cache-Control", "no-cache")
+        return response
+
+
 # Serve static files
 STATIC_DIR = Path(__file__).parent / "web" / "static"
-app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+app.mount("/static", RevalidatedStaticFiles(directory=str(STATIC_DIR)), name="static")
+
+# index.html 每次部署不变：启动时读入内存，配合强 ETag 返回 304
+_INDEX_BYTES = (STATIC_DIR / "index.html").read_bytes()
+_INDEX_ETAG = f'"{hashlib.blake2b(_INDEX_BYTES, digest_size=16).hexdigest()}"'
+_INDEX_HEADERS = {"ETag": _INDEX_ETAG, "Cache-Control": "no-cache"}
 
 
 @app.get("/")
-async def index():
+async def index(request: Request):
     """Serve the SPA"""
-    return FileResponse(str(STATIC_DIR / "index.html"))
+    if_none_match = request.headers.get("if-none-match", "")
+    if _INDEX_ETAG in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=_INDEX_HEADERS)
+    return Response(content=_INDEX_BYTES, media_type="text/html", headers=_INDEX_HEADERS)
 
 
-def open_browser(port: int, delay: float = 1.5):
+async def open_browser(port: int, delay: float = 1.5):
     """Delayed browser open"""
-    time.sleep(delay)
-    webbrowser.open(f"http://localhost:{port}")
+    await asyncio.sleep(delay)
+    await asyncio.to_thread(webbrowser.open, f"http://localhost:{port}")
+
+
+def _server_impls() -> tuple[str, str]:
+    """优先使用 uvloop + httptools（uvicorn[standard] 自带；Windows 无 uvloop 时回退 asyncio）"""
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return loop, http
 
 
 def main():
@@ -59,15 +100,28 @@ def main():
     parser.add_argument("--port", "-p", type=int, default=8000, help="端口 (默认: 8000)")
     parser.add_argument("--host", type=str, default="127.0.0.1", help="主机 (默认: 127.0.0.1)")
     parser.add_argument("--no-open", action="store_true", help="不自动打开浏览器")
+    parser.add_argument("--access-log", action="store_true", help="输出逐请求访问日志（默认关闭，前端轮询较频繁）")
     args = parser.parse_args()
 
-    if not args.no_open:
-        threading.Thread(target=open_browser, args=(args.port,), daemon=True).start()
+    # 由 lifespan 在事件循环上延迟打开浏览器
+    app.state.open_browser_port = None if args.no_open else args.port
 
     print(f"\n  rednote-content-studio Web App")
     print(f"  http://{args.host}:{args.port}\n")
 
-    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+    loop, http = _server_impls()
+
+    # 任务状态保存在进程内（SessionManager），因此固定单 worker；
+    # 耗时的转换已通过 asyncio.to_thread 移出事件循环。
+    uvicorn.run(
+        app,
+        host=args.host,
+        port=args.port,
+        loop=loop,
+        http=http,
+        log_level="info",
+        access_log=args.access_log,
+    )
 
 
 if __name__ == "__main__":
@@ -8,32 +8,118 @@
 
 from __future__ import annotations
 
+import functools
+import html
 import json
 import logging
-from dataclasses import dataclass, field
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Any, Optional, Callable
 
 try:
     from .config_llm import LLMConfig
     from .client import LLMClient
+    from .llm_cache import CachedLLMClient, LLMResponseCache
     from .core.markdown_parser import MarkdownParser, ParsedMarkdown
     from .core.image_analyzer import ImageAnalyzer, ImageAnalysis
     from .core.content_splitter import ContentSplitter
     from .core.rednote_formatter import RedNoteFormatter, FormattedPage
-    from .core.preview_renderer import PreviewRenderer, PreviewResult
+    from .core.preview_renderer import CachedPreviewRenderer, PreviewResult
 except ImportError:
     from config_llm import LLMConfig
     from client import LLMClient
+    from llm_cache import CachedLLMClient, LLMResponseCache
     from core.markdown_parser import MarkdownParser, ParsedMarkdown
     from core.image_analyzer import ImageAnalyzer, ImageAnalysis
     from core.content_splitter import ContentSplitter
     from core.rednote_formatter import RedNoteFormatter, FormattedPage
-    from core.preview_renderer import PreviewRenderer, PreviewResult
+    from core.preview_renderer import CachedPreviewRenderer, PreviewResult
+
+try:
+    import orjson
+except ImportError:  # 可选依赖：未安装时回退到标准库 json
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 
+# 合并预览页外壳（{total} 为总页数，{cards} 为各页 iframe）
+_COMBINED_HTML_TMPL = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>小红书排版预览</title>
+    <style>
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        body {{
+            font-family: "Noto Sans SC", -apple-system, "PingFang SC", "Microsoft YaHei", sans-serif;
+            background: #f0ede8;
+            min-height: 100vh;
+            padding: 40px 24px;
+        }}
+        .header {{ text-align: center; margin-bottom: 32px; }}
+        .header h1 {{ font-size: 20px; font-weight: 500; color: #333; letter-spacing: 1px; }}
+        .header p {{ font-size: 13px; color: #999; margin-top: 6px; }}
+        .cards {{
+            display: flex;
+            gap: 24px;
+            overflow-x: auto;
+            padding: 8px 0 24px;
+            scroll-snap-type: x mandatory;
+            -webkit-overflow-scrolling: touch;
+        }}
+        .cards::-webkit-scrollbar {{ height: 4px; }}
+        .cards::-webkit-scrollbar-thumb {{ background: #ccc; border-radius: 2px; }}
+        .card-frame {{
+            flex: 0 0 420px;
+            width: 420px;
+            height: 560px;
+            border: 0;
+            border-radius: 12px;
+            overflow: hidden;
+            background: #fffdf9;
+            box-shadow: 0 2px 16px rgba(0,0,0,0.06);
+            scroll-snap-align: center;
+        }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>小红书排版预览</h1>
+        <p>共 {total} 页 · 左右滑动查看</p>
+    </div>
+    <div class="cards">
+        {cards}
+    </div>
+</body>
+</html>"""
+
+
+# 内容优化的 user prompt：固定说明在前、页面内容居中、每轮变化的审查反馈放在最后，
+# 便于服务端前缀缓存在同一页的多轮迭代间命中
+_OPT_USER_TMPL = """请根据下方的审查反馈优化原始内容，保持语义不变。
+记住空行要用字符 ⠀ (U+2800)。
+===
+原始内容：
+{content}
+===
+审查反馈：
+{feedback}
+===
+请优化后返回新的内容。"""
+
+_OPT_FEEDBACK_TMPL = """审查评分：{score}/10
+
+发现的问题：
+{issues}
+
+改进建议：
+{suggestions}"""
+
 @dataclass
 class VisualReview:
     """视觉审查结果"""
@@ -58,6 +144,8 @@ class RedNoteAgent:
     """小红书排版智能体"""
 
     DEFAULT_MAX_ITERATIONS = 3
+    DEFAULT_MAX_CONCURRENCY = 4
+    SAVE_MAX_WORKERS = 8
     PASS_SCORE_THRESHOLD = 7
 
     REVIEW_SYSTEM_PROMPT = """你是一个小红书排版审查专家，负责评估排版效果。
@@ -82,6 +170,36 @@ class RedNoteAgent:
 评估空行效果、emoji使用、可读性和美感。
 返回JSON格式的评分和建议。"""
 
+    # 首轮审查时每次请求携带的最大页数（过多图片易超出模型的单次请求上限）
+    REVIEW_BATCH_SIZE = 6
+
+    REVIEW_BATCH_SYSTEM_PROMPT = """你是一个小红书排版审查专家，负责评估排版效果。
+
+你会依次收到同一篇笔记的多页预览图，请逐页评估以下方面：
+1. 空行效果：空行是否正确显示（不被吞掉）
+2. Emoji 使用：是否恰当、不过度
+3. 可读性：文字是否清晰、段落分明
+4. 美感：整体视觉效果是否舒适
+
+返回JSON格式（每张图片一项，顺序与图片一致）：
+{
+    "reviews": [
+        {
+            "page": 1,  // 页码
+            "score": 8,  // 1-10分
+            "issues": ["问题1"],  // 发现的问题
+            "suggestions": ["建议1"]  // 改进建议
+        }
+    ]
+}
+
+如果评分>=7分，说明该页排版合格。"""
+
+    REVIEW_BATCH_USER_PROMPT = """请审查以下 {count} 张小红书排版预览图，依次为第 {pages} 页。
+
+逐页评估空行效果、emoji使用、可读性和美感。
+返回JSON格式的评分和建议，reviews 中每页一项。"""
+
     OPTIMIZE_SYSTEM_PROMPT = """你是一个小红书排版优化专家。
 根据审查反馈优化排版内容。
 
@@ -100,6 +218,8 @@ class RedNoteAgent:
         output_dir: Optional[Path] = None,
         tone_system_prompt: Optional[str] = None,
         visual_style: Optional[dict] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        bypass_cache: bool = False,
     ):
         """
         初始化智能体
@@ -110,8 +230,11 @@ class RedNoteAgent:
             output_dir: 输出目录
             tone_system_prompt: 可选的自定义语气 system prompt
             visual_style: 可选的视觉样式字典
+            max_concurrency: 视觉反馈阶段并行处理的最大页数
+            bypass_cache: 忽略已缓存的图片分析、分页方案、审查/优化结果与渲染图，强制重新生成（新结果仍会写入缓存）
         """
         self.max_iterations = max_iterations
+        self.max_concurrency = max(1, int(max_concurrency))
         self.output_dir = Path(output_dir) if output_dir else Path("./output")
 
         # 初始化 LLM 客户端
@@ -119,12 +242,36 @@ class RedNoteAgent:
             llm_config = LLMConfig.resolve()
         self.llm_client = LLMClient(llm_config)
 
+        # 视觉审查 / 内容优化走响应缓存（目录可用 SKILL_LLM_CACHE_DIR 覆盖）
+        self.cache_dir = Path(os.getenv("SKILL_LLM_CACHE_DIR") or self.output_dir / ".llm_cache")
+        self._feedback_client = self.llm_client
+        try:
+            self._feedback_client = CachedLLMClient(
+                self.llm_client,
+                LLMResponseCache(self.cache_dir),
+                refresh=bypass_cache,
+            )
+        except Exception as e:
+            logger.warning(f"LLM response cache disabled: {e}")
+
         # 初始化各模块
         self.parser = MarkdownParser()
-        self.image_analyzer = ImageAnalyzer(self.llm_client)
-        self.content_splitter = ContentSplitter(self.llm_client)
+        self.image_analyzer = ImageAnalyzer(
+            self.llm_client,
+            cache_dir=self.cache_dir,
+            refresh=bypass_cache,
+            max_concurrency=self.max_concurrency,
+        )
+        self.content_splitter = ContentSplitter(self.llm_client, cache_dir=self.cache_dir, refresh=bypass_cache)
         self.formatter = RedNoteFormatter(self.llm_client, tone_system_prompt=tone_system_prompt)
-        self.renderer = PreviewRenderer(base_dir=self.output_dir, visual_style=visual_style)
+        # 合并预览的卡片 HTML 按 (内容, 页码, 图片, 总页数, 标题) 缓存，重复保存时无需重新渲染/转义
+        self._card_html = functools.lru_cache(maxsize=512)(self._build_card_html)
+        self.renderer = CachedPreviewRenderer(
+            base_dir=self.output_dir,
+            visual_style=visual_style,
+            cache_dir=self.output_dir / ".render_cache",
+            refresh=bypass_cache,
+        )
 
     @staticmethod
     def _resolve_image_analysis_target(image_path: str, base_dir: Path) -> str | Path:
@@ -139,6 +286,31 @@ class RedNoteAgent:
 
         return Path(image_path)
 
+    def _analyze_images(self, image_refs: list, base_dir: Path) -> list[ImageAnalysis]:
+        """
+        分析全部图片（并发加载，未缓存的图片合并为多图请求），结果保持 Markdown 中的顺序
+
+        Args:
+            image_refs: ImageRef 列表
+            base_dir: 解析相对路径的基础目录
+
+        Returns:
+            ImageAnalysis 列表，path 保留原始引用路径
+        """
+        if not image_refs:
+            return []
+
+        original_paths = [str(ref.path) for ref in image_refs]
+        # 分析器内部并发加载、查缓存，并把未命中的图片按批合并为多图请求
+        analyses = self.image_analyzer.analyze_batch(
+            [self._resolve_image_analysis_target(path, base_dir) for path in original_paths],
+            base_dir,
+        )
+
+        for analysis, original_path in zip(analyses, original_paths):
+            analysis.path = original_path
+        return analyses
+
     def _visual_review(self, preview: PreviewResult, page_number: int) -> VisualReview:
         """
         视觉审查预览图
@@ -151,7 +323,7 @@ class RedNoteAgent:
             VisualReview 对象
         """
         try:
-            result = self.llm_client.chat_with_image(
+            result = self._feedback_client.chat_with_image(
                 system_prompt=self.REVIEW_SYSTEM_PROMPT,
                 user_prompt=self.REVIEW_USER_PROMPT,
                 image_bytes=preview.image_bytes,
@@ -161,30 +333,8 @@ class RedNoteAgent:
                 json_mode=True,
             )
 
-            data = self.llm_client.parse_json(result.content, default={})
-            if not isinstance(data, dict):
-                data = {}
-
-            try:
-                score = int(float(data.get('score', 5)))
-            except Exception:
-                score = 5
-            score = max(1, min(10, score))
-
-            issues = data.get('issues', [])
-            if not isinstance(issues, list):
-                issues = [str(issues)]
-
-            suggestions = data.get('suggestions', [])
-            if not isinstance(suggestions, list):
-                suggestions = [str(suggestions)]
-
-            return VisualReview(
-                score=score,
-                issues=[str(item) for item in issues if str(item).strip()],
-                suggestions=[str(item) for item in suggestions if str(item).strip()],
-                pass_threshold=score >= self.PASS_SCORE_THRESHOLD,
-            )
+            data = self._feedback_client.parse_json(result.content, default={})
+            return self._review_from_data(data)
 
         except Exception as e:
             logger.warning(f"Visual review failed for page {page_number}: {e}")
@@ -196,6 +346,100 @@ class RedNoteAgent:
                 pass_threshold=True,
             )
 
+    def _review_from_data(self, data: Any) -> VisualReview:
+        """把模型返回的单页审查 JSON 规整为 VisualReview"""
+        if not isinstance(data, dict):
+            data = {}
+
+        try:
+            score = int(float(data.get('score', 5)))
+        except Exception:
+            score = 5
+        score = max(1, min(10, score))
+
+        issues = data.get('issues', [])
+        if not isinstance(issues, list):
+            issues = [str(issues)]
+
+        suggestions = data.get('suggestions', [])
+        if not isinstance(suggestions, list):
+            suggestions = [str(suggestions)]
+
+        return VisualReview(
+            score=score,
+            issues=[str(item) for item in issues if str(item).strip()],
+            suggestions=[str(item) for item in suggestions if str(item).strip()],
+            pass_threshold=score >= self.PASS_SCORE_THRESHOLD,
+        )
+
+    def _visual_review_batch(
+        self,
+        previews: list[PreviewResult],
+        page_numbers: list[int],
+    ) -> list[Optional[VisualReview]]:
+        """
+        一次请求审查多页预览图（首轮审查用，减少网络往返）
+
+        Args:
+            previews: 预览结果列表
+            page_numbers: 与 previews 对应的页码
+
+        Returns:
+            与 previews 等长的列表；解析失败或缺失的页为 None，由调用方逐页重审
+        """
+        reviews: list[Optional[VisualReview]] = [None] * len(previews)
+        batch_size = max(1, self.REVIEW_BATCH_SIZE)
+
+        for start in range(0, len(previews), batch_size):
+            chunk_pages = page_numbers[start:start + batch_size]
+            chunk_previews = previews[start:start + batch_size]
+            if len(chunk_previews) == 1:
+                # 单页直接走原有的单图审查
+                continue
+
+            try:
+                result = self._feedback_client.chat_with_images(
+                    system_prompt=self.REVIEW_BATCH_SYSTEM_PROMPT,
+                    user_prompt=self.REVIEW_BATCH_USER_PROMPT.format(
+                        count=len(chunk_previews),
+                        pages="、".join(str(num) for num in chunk_pages),
+                    ),
+                    images=[preview.image_bytes for preview in chunk_previews],
+                    image_mime="image/png",
+                    temperature=0.3,
+                    max_tokens=500 * len(chunk_previews),
+                    json_mode=True,
+                )
+                data = self._feedback_client.parse_json(result.content, default={})
+            except Exception as e:
+                logger.warning(f"Batch visual review failed for pages {chunk_pages}: {e}")
+                continue
+
+            items = data.get('reviews') if isinstance(data, dict) else data
+            if not isinstance(items, list):
+                logger.warning(f"Batch visual review returned no list for pages {chunk_pages}")
+                continue
+
+            by_page: dict[int, dict] = {}
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    by_page[int(item.get('page'))] = item
+                except (TypeError, ValueError):
+                    continue
+
+            # 优先按页码对齐；页码缺失但条数一致时按顺序对齐
+            if not by_page and len(items) == len(chunk_previews):
+                by_page = {num: item for num, item in zip(chunk_pages, items)}
+
+            for offset, page_num in enumerate(chunk_pages):
+                item = by_page.get(page_num)
+                if isinstance(item, dict):
+                    reviews[start + offset] = self._review_from_data(item)
+
+        return reviews
+
     def _optimize_content(
         self,
         content: str,
@@ -214,24 +458,19 @@ class RedNoteAgent:
             优化后的内容
         """
         try:
-            feedback = f"""审查评分：{review.score}/10
-
-发现的问题：
-{chr(10).join(f'- {issue}' for issue in review.issues) if review.issues else '无'}
-
-改进建议：
-{chr(10).join(f'- {sug}' for sug in review.suggestions) if review.suggestions else '无'}"""
+            issues_block = "\n".join(["- " + issue for issue in review.issues]) if review.issues else "无"
+            suggestions_block = (
+                "\n".join(["- " + sug for sug in review.suggestions]) if review.suggestions else "无"
+            )
+            feedback = _OPT_FEEDBACK_TMPL.format(
+                score=review.score,
+                issues=issues_block,
+                suggestions=suggestions_block,
+            )
 
-            result = self.llm_client.chat_text(
+            result = self._feedback_client.chat_text(
                 system_prompt=self.OPTIMIZE_SYSTEM_PROMPT,
-                user_prompt=f"""原始内容：
-{content}
-
-审查反馈：
-{feedback}
-
-请优化后返回新的内容，保持语义不变。
-记住空行要用字符 ⠀ (U+2800)。""",
+                user_prompt=_OPT_USER_TMPL.format(content=content, feedback=feedback),
                 temperature=0.5,
                 max_tokens=2000,
             )
@@ -264,33 +503,39 @@ class RedNoteAgent:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         output_files: dict[str, Path] = {}
 
-        # 保存每页文本
+        # 文件写入互不依赖且会释放 GIL：收集成任务后交给线程池并发执行
+        # (目标路径, 数据, 可直接复制的源文件)；源文件来自渲染缓存，存在时不再经过内存写出
+        write_jobs: list[tuple[Path, str | bytes, Optional[Path]]] = []
+
+        # 每页文本
         for page in result.pages:
             txt_path = self.output_dir / f"page_{page.page_number}.txt"
-            with open(txt_path, 'w', encoding='utf-8') as f:
-                f.write(page.content)
+            write_jobs.append((txt_path, page.content, None))
             output_files[f'page_{page.page_number}_txt'] = txt_path
 
-        # 保存每页预览
+        # 每页预览
         for i, preview in enumerate(result.previews):
             page_num = i + 1
 
             img_path = self.output_dir / f"preview_page_{page_num}.png"
-            with open(img_path, 'wb') as f:
-                f.write(preview.image_bytes)
+            write_jobs.append((img_path, preview.image_bytes, preview.image_path))
             output_files[f'page_{page_num}_png'] = img_path
 
             html_path = self.output_dir / f"preview_page_{page_num}.html"
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(preview.html_content)
+            write_jobs.append((html_path, preview.html_content, None))
             output_files[f'page_{page_num}_html'] = html_path
 
-        # 保存合并的 HTML 预览
-        combined_html = self._generate_combined_html(result)
-        combined_path = self.output_dir / "preview.html"
-        with open(combined_path, 'w', encoding='utf-8') as f:
-            f.write(combined_html)
-        output_files['preview_html'] = combined_path
+        with ThreadPoolExecutor(max_workers=self.SAVE_MAX_WORKERS) as executor:
+            futures = [executor.submit(self._write_output_file, *job) for job in write_jobs]
+
+            # 合并的 HTML 预览（各页卡片同样在线程池中生成）
+            combined_html = self._generate_combined_html(result, executor=executor)
+            combined_path = self.output_dir / "preview.html"
+            futures.append(executor.submit(self._write_output_file, combined_path, combined_html))
+            output_files['preview_html'] = combined_path
+
+            for future in futures:
+                future.result()
 
         # 保存 JSON 数据
         json_data = {
@@ -331,81 +576,73 @@ class RedNoteAgent:
         }
 
         json_path = self.output_dir / "result.json"
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            json_path.write_bytes(orjson.dumps(json_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(json_data, f, ensure_ascii=False, indent=2)
         output_files['result_json'] = json_path
 
         return output_files
 
-    def _generate_combined_html(self, result: ConversionResult) -> str:
-        """生成合并的 HTML 预览（统一使用 PreviewRenderer 输出）"""
-        import html as html_mod
+    @staticmethod
+    def _write_output_file(path: Path, data: str | bytes, source_path: Optional[Path] = None) -> None:
+        if source_path is not None:
+            try:
+                # copyfile 在 Linux 上走 sendfile，文件内容不经过用户态
+                shutil.copyfile(source_path, path)
+                return
+            except OSError:
+                pass  # 缓存文件可能已被清理，退回内存写出
+        if isinstance(data, bytes):
+            path.write_bytes(data)
+        else:
+            path.write_text(data, encoding='utf-8')
+
+    def _build_card_html(
+        self,
+        content: str,
+        page_number: int,
+        image_urls: tuple[str, ...],
+        image_slots: tuple[int, ...],
+        total_pages: int,
+        use_title: bool,
+    ) -> str:
+        """渲染单页卡片并转义为 iframe srcdoc（经 lru_cache 包装，见 __init__）"""
+        card_html = self.renderer.render_to_html(
+            content=content,
+            page_number=page_number,
+            image_urls=list(image_urls),
+            image_slots=list(image_slots),
+            total_pages=total_pages,
+            use_title=use_title,
+        )
+        escaped_card_html = html.escape(card_html, quote=True)
+        return f'<iframe class="card-frame" srcdoc="{escaped_card_html}"></iframe>'
 
+    def _generate_combined_html(
+        self,
+        result: ConversionResult,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ) -> str:
+        """生成合并的 HTML 预览（统一使用 PreviewRenderer 输出）"""
         total = len(result.pages)
-        cards_html: list[str] = []
-
-        for idx, page in enumerate(result.pages):
-            card_html = self.renderer.render_to_html(
-                content=page.content,
-                page_number=idx + 1,
-                image_urls=page.image_urls,
-                image_slots=page.image_slots,
-                total_pages=total,
-                use_title=(idx == 0),
+
+        def _card(item: tuple[int, FormattedPage]) -> str:
+            idx, page = item
+            return self._card_html(
+                page.content,
+                idx + 1,
+                tuple(page.image_urls),
+                tuple(page.image_slots),
+                total,
+                idx == 0,
             )
-            escaped_card_html = html_mod.escape(card_html, quote=True)
-            cards_html.append(f'<iframe class="card-frame" srcdoc="{escaped_card_html}"></iframe>')
 
-        return f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>小红书排版预览</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: "Noto Sans SC", -apple-system, "PingFang SC", "Microsoft YaHei", sans-serif;
-            background: #f0ede8;
-            min-height: 100vh;
-            padding: 40px 24px;
-        }}
-        .header {{ text-align: center; margin-bottom: 32px; }}
-        .header h1 {{ font-size: 20px; font-weight: 500; color: #333; letter-spacing: 1px; }}
-        .header p {{ font-size: 13px; color: #999; margin-top: 6px; }}
-        .cards {{
-            display: flex;
-            gap: 24px;
-            overflow-x: auto;
-            padding: 8px 0 24px;
-            scroll-snap-type: x mandatory;
-            -webkit-overflow-scrolling: touch;
-        }}
-        .cards::-webkit-scrollbar {{ height: 4px; }}
-        .cards::-webkit-scrollbar-thumb {{ background: #ccc; border-radius: 2px; }}
-        .card-frame {{
-            flex: 0 0 420px;
-            width: 420px;
-            height: 560px;
-            border: 0;
-            border-radius: 12px;
-            overflow: hidden;
-            background: #fffdf9;
-            box-shadow: 0 2px 16px rgba(0,0,0,0.06);
-            scroll-snap-align: center;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>小红书排版预览</h1>
-        <p>共 {total} 页 · 左右滑动查看</p>
-    </div>
-    <div class="cards">
-        {''.join(cards_html)}
-    </div>
-</body>
-</html>'''
+        items = enumerate(result.pages)
+        cards_html = list(executor.map(_card, items)) if executor else [_card(item) for item in items]
+
+        return _COMBINED_HTML_TMPL.format(total=total, cards="".join(cards_html))
 
     @staticmethod
     def _emit_progress(
@@ -415,6 +652,111 @@ class RedNoteAgent:
         if progress_callback:
             progress_callback(data)
 
+    def _report_page_done(
+        self,
+        page_num: int,
+        total_pages: int,
+        formatted_pages: list[FormattedPage],
+        previews: list[PreviewResult],
+        result_store: Optional[dict],
+        progress_callback: Optional[Callable[[dict], None]],
+    ) -> None:
+        """Publish the first `page_num` finished pages to the store and progress callback."""
+        divisor = total_pages if total_pages > 0 else 1
+        progress = 0.45 + (0.45 * page_num / divisor)
+        if result_store is not None:
+            result_store["pages"] = list(formatted_pages[:page_num])
+            result_store["previews"] = list(previews)
+        if progress_callback:
+            self._emit_progress(
+                progress_callback,
+                {"type": "page_done", "page": page_num, "total_pages": total_pages,
+                 "progress": progress},
+            )
+
+    def _render_page(
+        self,
+        formatted: FormattedPage,
+        content: str,
+        page_num: int,
+        total_pages: int,
+    ) -> PreviewResult:
+        return self.renderer.render(
+            content,
+            page_num,
+            image_urls=formatted.image_urls,
+            image_slots=formatted.image_slots,
+            total_pages=total_pages,
+            use_title=(page_num == 1),
+        )
+
+    @staticmethod
+    def _page_dedup_key(formatted: FormattedPage, page_idx: int) -> tuple:
+        """决定两页能否共享视觉反馈结果的键（首页带标题，单独成组）"""
+        return (
+            formatted.content,
+            tuple(formatted.image_urls),
+            tuple(formatted.image_slots),
+            page_idx == 0,
+        )
+
+    def _refine_page(
+        self,
+        page_idx: int,
+        formatted: FormattedPage,
+        total_pages: int,
+        log_reviews: bool = False,
+        first_pass: Optional[tuple[PreviewResult, Optional[VisualReview]]] = None,
+    ) -> tuple[FormattedPage, PreviewResult, VisualReview, int]:
+        """
+        Run render → review → optimize iterations for one page.
+
+        first_pass carries the preview (and batch review, if any) already produced
+        for iteration 1, so it is not rendered or reviewed twice.
+        """
+        page_num = page_idx + 1
+        current_content = formatted.content
+        preview: Optional[PreviewResult] = None
+        # max_iterations < 1 时只渲染，不审查
+        review = VisualReview(score=7, issues=[], suggestions=[], pass_threshold=True)
+        iterations = 0
+
+        for iteration in range(1, self.max_iterations + 1):
+            if iteration == 1 and first_pass is not None:
+                preview, batch_review = first_pass
+            else:
+                preview = self._render_page(formatted, current_content, page_num, total_pages)
+                batch_review = None
+
+            review = batch_review or self._visual_review(preview, page_num)
+            iterations = iteration
+            if log_reviews:
+                logger.info(
+                    f"  Page {page_num}, iteration {iteration}: "
+                    f"score={review.score}, passed={review.pass_threshold}"
+                )
+
+            if review.pass_threshold or iteration == self.max_iterations:
+                break
+
+            optimized = self._optimize_content(current_content, review, page_num)
+            if optimized == current_content:
+                # 内容未变化，继续迭代只会得到相同的渲染与审查结果
+                logger.info(f"  Page {page_num}: content unchanged after optimization, stop iterating")
+                break
+            current_content = optimized
+
+        if preview is None:
+            preview = self._render_page(formatted, current_content, page_num, total_pages)
+
+        page = replace(
+            formatted,
+            page_number=page_num,
+            content=current_content,
+            char_count=len(current_content),
+        )
+        return page, preview, review, iterations
+
     def _run_render_feedback_loop(
         self,
         formatted_pages: list[FormattedPage],
@@ -426,7 +768,6 @@ class RedNoteAgent:
     ) -> tuple[list[FormattedPage], list[PreviewResult], list[VisualReview], int]:
         """Run preview rendering + optional visual feedback optimization loop."""
         total_pages = len(formatted_pages)
-        divisor = total_pages if total_pages > 0 else 1
 
         all_reviews: list[VisualReview] = []
         all_previews: list[PreviewResult] = []
@@ -442,68 +783,72 @@ class RedNoteAgent:
             elif log_steps:
                 logger.info("Step 5: Visual feedback loop...")
 
+            # 各页的 渲染→审查→优化 互不依赖，且耗时主要在 LLM 网络调用上，
+            # 因此先一次性提交全部页面，再按完成顺序收集结果。
+            finished: dict[int, tuple[FormattedPage, PreviewResult, VisualReview, int]] = {}
+            next_idx = 0
+            max_workers = max(1, min(self.max_concurrency, total_pages))
+            # 内容、图片与标题设置完全相同的页只跑一次 渲染→审查→优化，结果复用到其余页
+            groups: dict[tuple, list[int]] = {}
             for page_idx, formatted in enumerate(formatted_pages):
-                page_num = page_idx + 1
-                current_content = formatted.content
-
-                for iteration in range(1, self.max_iterations + 1):
-                    total_iterations = max(total_iterations, iteration)
-
-                    preview = self.renderer.render(
-                        current_content,
-                        page_num,
-                        image_urls=formatted.image_urls,
-                        image_slots=formatted.image_slots,
-                        total_pages=total_pages,
-                        use_title=(page_num == 1),
+                groups.setdefault(self._page_dedup_key(formatted, page_idx), []).append(page_idx)
+            leaders = [indices[0] for indices in groups.values()]
+            followers = {indices[0]: indices[1:] for indices in groups.values()}
+            if len(leaders) < total_pages:
+                logger.info(f"  {total_pages - len(leaders)} duplicate page(s) will reuse feedback results")
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # 首轮：先渲染全部页面，再合并成一次（或少数几次）多图审查请求
+                first_passes: dict[int, tuple[PreviewResult, Optional[VisualReview]]] = {}
+                if self.max_iterations >= 1 and leaders:
+                    first_previews = list(executor.map(
+                        lambda idx: self._render_page(
+                            formatted_pages[idx], formatted_pages[idx].content, idx + 1, total_pages
+                        ),
+                        leaders,
+                    ))
+                    first_reviews = self._visual_review_batch(
+                        first_previews, [idx + 1 for idx in leaders]
                     )
-
-                    review = self._visual_review(preview, page_num)
-                    if log_reviews:
-                        logger.info(
-                            f"  Page {page_num}, iteration {iteration}: "
-                            f"score={review.score}, passed={review.pass_threshold}"
-                        )
-
-                    if review.pass_threshold:
-                        all_reviews.append(review)
+                    first_passes = dict(zip(leaders, zip(first_previews, first_reviews)))
+
+                futures = {
+                    executor.submit(
+                        self._refine_page,
+                        page_idx,
+                        formatted_pages[page_idx],
+                        total_pages,
+                        log_reviews,
+                        first_passes.get(page_idx),
+                    ): page_idx
+                    for page_idx in leaders
+                }
+                for future in as_completed(futures):
+                    leader_idx = futures[future]
+                    finished[leader_idx] = future.result()
+                    page, _, review, iterations = finished[leader_idx]
+                    for dup_idx in followers[leader_idx]:
+                        # 页码不同，预览图需按各自页码重新渲染（命中渲染缓存时很快）
+                        dup_page = replace(page, page_number=dup_idx + 1)
+                        dup_preview = self._render_page(dup_page, dup_page.content, dup_idx + 1, total_pages)
+                        finished[dup_idx] = (dup_page, dup_preview, review, iterations)
+
+                    # 按页码顺序发布，保证 result_store / page_done 始终是连续前缀
+                    while next_idx in finished:
+                        page, preview, review, iterations = finished.pop(next_idx)
+                        formatted_pages[next_idx] = page
                         all_previews.append(preview)
-                        formatted_pages[page_idx] = FormattedPage(
-                            page_number=page_num,
-                            content=current_content,
-                            char_count=len(current_content),
-                            emoji_count=formatted.emoji_count,
-                            has_proper_spacing=formatted.has_proper_spacing,
-                            image_urls=formatted.image_urls,
-                            image_slots=formatted.image_slots,
-                        )
-                        break
-
-                    if iteration < self.max_iterations:
-                        current_content = self._optimize_content(current_content, review, page_num)
-                    else:
                         all_reviews.append(review)
-                        all_previews.append(preview)
-                        formatted_pages[page_idx] = FormattedPage(
-                            page_number=page_num,
-                            content=current_content,
-                            char_count=len(current_content),
-                            emoji_count=formatted.emoji_count,
-                            has_proper_spacing=formatted.has_proper_spacing,
-                            image_urls=formatted.image_urls,
-                            image_slots=formatted.image_slots,
+                        total_iterations = max(total_iterations, iterations)
+                        next_idx += 1
+                        self._report_page_done(
+                            next_idx,
+                            total_pages,
+                            formatted_pages,
+                            all_previews,
+                            result_store,
+                            progress_callback,
                         )
-
-                progress = 0.45 + (0.45 * page_num / divisor)
-                if result_store is not None:
-                    result_store["pages"] = list(formatted_pages[:page_idx + 1])
-                    result_store["previews"] = list(all_previews)
-                if progress_callback:
-                    self._emit_progress(
-                        progress_callback,
-                        {"type": "page_done", "page": page_num, "total_pages": total_pages,
-                         "progress": progress},
-                    )
         else:
             if log_steps:
                 logger.info("Step 5: Rendering previews (no visual feedback)...")
@@ -525,16 +870,14 @@ class RedNoteAgent:
                     pass_threshold=True,
                 ))
 
-                progress = 0.45 + (0.45 * page_num / divisor)
-                if result_store is not None:
-                    result_store["pages"] = list(formatted_pages[:page_idx + 1])
-                    result_store["previews"] = list(all_previews)
-                if progress_callback:
-                    self._emit_progress(
-                        progress_callback,
-                        {"type": "page_done", "page": page_num, "total_pages": total_pages,
-                         "progress": progress},
-                    )
+                self._report_page_done(
+                    page_num,
+                    total_pages,
+                    formatted_pages,
+                    all_previews,
+                    result_store,
+                    progress_callback,
+                )
 
         return formatted_pages, all_previews, all_reviews, total_iterations
 
@@ -698,12 +1041,7 @@ class RedNoteAgent:
         )
         image_analyses: list[ImageAnalysis] = []
         if parsed.images:
-            for ref in parsed.images:
-                original_path = str(ref.path)
-                target = self._resolve_image_analysis_target(original_path, resolve_base)
-                analysis = self.image_analyzer.analyze(target, resolve_base)
-                analysis.path = original_path
-                image_analyses.append(analysis)
+            image_analyses = self._analyze_images(parsed.images, resolve_base)
             logger.info(f"  Analyzed {len(image_analyses)} images")
 
         return self._run_pipeline(
@@ -752,13 +1090,7 @@ class RedNoteAgent:
         logger.info("Step 2: Analyzing images...")
         image_analyses: list[ImageAnalysis] = []
         if parsed.images:
-            base_dir = markdown_path.parent
-            for ref in parsed.images:
-                original_path = str(ref.path)
-                target = self._resolve_image_analysis_target(original_path, base_dir)
-                analysis = self.image_analyzer.analyze(target, base_dir)
-                analysis.path = original_path
-                image_analyses.append(analysis)
+            image_analyses = self._analyze_images(parsed.images, markdown_path.parent)
             logger.info(f"  Analyzed {len(image_analyses)} images")
         else:
             logger.info("  No images to analyze")
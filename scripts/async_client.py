@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Async variant of LLMClient for fanning out independent requests.
+
+Same request shapes, retry policy and errors as client.LLMClient, built on
+openai.AsyncOpenAI. chat_text_batch() issues many prompts concurrently (bounded by
+a semaphore) so N independent calls finish in roughly max(latency) instead of sum.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+try:
+    from .client import (
+        _JSON_MODE_REJECT_RE,
+        ChatResult,
+        LLMClient,
+        PermanentLLMError,
+        TransientLLMError,
+        _apply_prompt_cache,
+        _backoff_table,
+        _image_data_url,
+        _is_transient_error,
+        _request_timeout,
+        _retry_delay,
+    )
+    from .config_llm import LLMConfig, mask_secret
+except ImportError:
+    from client import (
+        _JSON_MODE_REJECT_RE,
+        ChatResult,
+        LLMClient,
+        PermanentLLMError,
+        TransientLLMError,
+        _apply_prompt_cache,
+        _backoff_table,
+        _image_data_url,
+        _is_transient_error,
+        _request_timeout,
+        _retry_delay,
+    )
+    from config_llm import LLMConfig, mask_secret
+
+try:
+    from openai import AsyncOpenAI  # type: ignore
+except ImportError:  # pragma: no cover
+    AsyncOpenAI = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncLLMClient:
+    DEFAULT_MAX_CONCURRENCY = 4
+
+    __slots__ = ("config", "client", "_backoff", "_semaphore")
+
+    def __init__(self, config: LLMConfig, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        if AsyncOpenAI is None:  # pragma: no cover
+            raise RuntimeError("Missing dependency: openai. Install with: pip install openai")
+
+        self.config = config
+        # One AsyncOpenAI (and so one async connection pool) per instance: async pools are
+        # bound to the event loop they were first used on, so they are not shared globally.
+        self.client = AsyncOpenAI(
+            api_key=config.api_key,
+            base_url=config.base_url,
+            timeout=_request_timeout(config),
+            default_headers={"User-Agent": "Mozilla/5.0"},
+        )
+        self._backoff = _backoff_table(config)
+        self._semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+
+        logger.info(
+            "Async LLM client ready: model=%s base_url=%s api_key=%s",
+            config.model,
+            config.base_url,
+            mask_secret(config.api_key),
+        )
+
+    parse_json = staticmethod(LLMClient.parse_json)
+    to_json = staticmethod(LLMClient.to_json)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def __aenter__(self) -> "AsyncLLMClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def _call_chat(
+        self,
+        *,
+        messages: list[dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool,
+    ) -> ChatResult:
+        kwargs: dict[str, Any] = {}
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        messages, extra_headers = _apply_prompt_cache(self.config, messages)
+        if extra_headers:
+            kwargs["extra_headers"] = extra_headers
+
+        async with self._semaphore:
+            response = await self.client.chat.completions.create(
+                model=self.config.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs,
+            )
+
+        content = (response.choices[0].message.content or "").strip()
+        if not content:
+            raise TransientLLMError("Empty response content")
+        return ChatResult(content=content, raw=response)
+
+    async def _call_with_retry(
+        self,
+        *,
+        messages: list[dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool,
+    ) -> ChatResult:
+        last_error: Exception | None = None
+        deadline = time.monotonic() + self.config.total_deadline_s
+
+        for attempt in range(1, self.config.max_retries + 1):
+            try:
+                return await self._call_chat(
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    json_mode=json_mode,
+                )
+            except Exception as e:
+                last_error = e
+
+                if type(e).__name__ == "AuthenticationError":
+                    raise PermanentLLMError(str(e)) from e
+
+                if json_mode and _JSON_MODE_REJECT_RE.search(str(e)):
+                    logger.warning("Provider rejected JSON mode; retrying once without json_mode.")
+                    return await self._call_chat(
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        json_mode=False,
+                    )
+
+                if attempt >= self.config.max_retries:
+                    raise TransientLLMError(str(e)) from e
+
+                if _is_transient_error(e) or isinstance(e, TransientLLMError):
+                    delay = _retry_delay(self._backoff, attempt)
+                    if time.monotonic() + delay >= deadline:
+                        logger.warning(
+                            "LLM call exceeded its %.0fs deadline after %d attempt(s); giving up.",
+                            self.config.total_deadline_s,
+                            attempt,
+                        )
+                        raise TransientLLMError(str(e)) from e
+                    logger.warning(
+                        "Transient LLM error (%s). Retry %d/%d in %.1fs",
+                        type(e).__name__,
+                        attempt,
+                        self.config.max_retries,
+                        delay,
+                    )
+                    # Sleep outside the semaphore so a backing-off request frees its slot.
+                    await asyncio.sleep(delay)
+                    continue
+
+                raise PermanentLLMError(str(e)) from e
+
+        raise TransientLLMError(str(last_error))
+
+    async def chat_text(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+        json_mode: bool = False,
+    ) -> ChatResult:
+        messages: list[dict[str, Any]] = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        return await self._call_with_retry(
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=json_mode,
+        )
+
+    async def chat_with_image(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        image_bytes: bytes,
+        image_mime: str = "image/png",
+        temperature: float = 0.0,
+        max_tokens: int = 1200,
+        json_mode: bool = False,
+    ) -> ChatResult:
+        messages: list[dict[str, Any]] = [
+            {"role": "system", "content": system_prompt},
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": user_prompt},
+                    {"type": "image_url", "image_url": {"url": _image_data_url(image_bytes, image_mime)}},
+                ],
+            },
+        ]
+        return await self._call_with_retry(
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=json_mode,
+        )
+
+    async def chat_text_batch(
+        self,
+        *,
+        system_prompt: str,
+        user_prompts: list[str],
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+        json_mode: bool = False,
+    ) -> list[ChatResult]:
+        """Run one chat_text per user prompt concurrently; results keep the input order."""
+        return list(
+            await asyncio.gather(
+                *(
+                    self.chat_text(
+                        system_prompt=system_prompt,
+                        user_prompt=user_prompt,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        json_mode=json_mode,
+                    )
+                    for user_prompt in user_prompts
+                )
+            )
+        )
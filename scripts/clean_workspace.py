@@ -13,9 +13,12 @@
 from __future__ import annotations
 
 import argparse
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 
 @dataclass
@@ -24,11 +27,14 @@ class CleanupStats:
     removed_dirs: int = 0
 
 
-def _remove_path(target: Path, dry_run: bool, stats: CleanupStats) -> None:
-    if not target.exists():
-        return
+def _remove_path(target: Path, dry_run: bool, stats: CleanupStats, is_dir: Optional[bool] = None) -> None:
+    """is_dir 已知（如来自 scandir 缓存的类型信息）时跳过 exists / is_dir 的额外 stat。"""
+    if is_dir is None:
+        if not target.exists():
+            return
+        is_dir = target.is_dir()
 
-    if target.is_dir():
+    if is_dir:
         if dry_run:
             print(f"[DRY-RUN] remove dir: {target}")
         else:
@@ -44,34 +50,54 @@ def _remove_path(target: Path, dry_run: bool, stats: CleanupStats) -> None:
         stats.removed_files += 1
 
 
-def clean_pycache(root: Path, dry_run: bool, stats: CleanupStats) -> None:
-    for cache_dir in root.rglob("__pycache__"):
-        if cache_dir.is_dir():
-            _remove_path(cache_dir, dry_run=dry_run, stats=stats)
+def clean_pycache(root: Path, dry_run: bool, stats: CleanupStats, parallel: bool = False) -> None:
+    # os.walk 每个目录只列一次；命中的 __pycache__ 从 dirnames 中剔除，不再深入遍历
+    cache_dirs: list[Path] = []
+    for dirpath, dirnames, _ in os.walk(root):
+        if "__pycache__" not in dirnames:
+            continue
+        dirnames.remove("__pycache__")
+        cache_dirs.append(Path(dirpath) / "__pycache__")
 
+    if not parallel or dry_run:
+        for cache_dir in cache_dirs:
+            _remove_path(cache_dir, dry_run=dry_run, stats=stats)
+        return
 
-def clean_output(root: Path, dry_run: bool, stats: CleanupStats) -> None:
-    output_dir = root / "output"
-    if not output_dir.exists():
+    # rmtree 以 unlink 系统调用为主，多线程并发删除；统计与输出留在主线程
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 8) as executor:
+        futures = {
+            executor.submit(shutil.rmtree, cache_dir, ignore_errors=True): cache_dir
+            for cache_dir in cache_dirs
+        }
+        for future in as_completed(futures):
+            future.result()
+            print(f"[OK] removed dir: {futures[future]}")
+            stats.removed_dirs += 1
+
+
+def _clean_dir_contents(directory: Path, keep_names: set[str], dry_run: bool, stats: CleanupStats) -> None:
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name in keep_names:
+                    continue
+                _remove_path(
+                    Path(entry.path),
+                    dry_run=dry_run,
+                    stats=stats,
+                    is_dir=entry.is_dir(follow_symlinks=False),
+                )
+    except FileNotFoundError:
         return
 
-    keep_names = {".gitkeep", "README.md"}
-    for item in output_dir.iterdir():
-        if item.name in keep_names:
-            continue
-        _remove_path(item, dry_run=dry_run, stats=stats)
 
+def clean_output(root: Path, dry_run: bool, stats: CleanupStats) -> None:
+    _clean_dir_contents(root / "output", {".gitkeep", "README.md"}, dry_run=dry_run, stats=stats)
 
-def clean_archives(root: Path, dry_run: bool, stats: CleanupStats) -> None:
-    archives_dir = root / "docs" / "archives"
-    if not archives_dir.exists():
-        return
 
-    keep_names = {".gitkeep"}
-    for item in archives_dir.iterdir():
-        if item.name in keep_names:
-            continue
-        _remove_path(item, dry_run=dry_run, stats=stats)
+def clean_archives(root: Path, dry_run: bool, stats: CleanupStats) -> None:
+    _clean_dir_contents(root / "docs" / "archives", {".gitkeep"}, dry_run=dry_run, stats=stats)
 
 
 def main() -> int:
@@ -86,6 +112,11 @@ def main() -> int:
         action="store_true",
         help="同时清理 docs/archives 下的调试归档",
     )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="并发删除 __pycache__ 目录（dry-run 时忽略）",
+    )
     args = parser.parse_args()
 
     project_root = Path(__file__).resolve().parent.parent
@@ -94,7 +125,7 @@ def main() -> int:
     print(f"[INFO] project root: {project_root}")
     print(f"[INFO] dry-run: {args.dry_run}")
 
-    clean_pycache(project_root, dry_run=args.dry_run, stats=stats)
+    clean_pycache(project_root, dry_run=args.dry_run, stats=stats, parallel=args.parallel)
     clean_output(project_root, dry_run=args.dry_run, stats=stats)
 
     if args.include_archives:
@@ -4,18 +4,24 @@ Minimal OpenAI-compatible LLM client with retries.
 
 Supports:
 - Text chat
-- Vision chat (image bytes)
+- Vision chat (image bytes, single or multiple images per request)
 - Optional JSON mode (response_format=json_object) with fallback when unsupported
 """
 
 from __future__ import annotations
 
 import base64
+import functools
+import hashlib
 import json
 import logging
+import os
 import random
+import re
+import threading
 import time
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
 try:
@@ -23,9 +29,31 @@ try:
 except ImportError:
     from config_llm import LLMConfig, mask_secret
 
+try:
+    from openai import DefaultHttpxClient, OpenAI, Timeout  # type: ignore
+except ImportError:  # pragma: no cover
+    DefaultHttpxClient = None
+    OpenAI = None
+    Timeout = None
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _loads_json(text: str) -> Any:
+    """json.loads, via orjson when installed (falls back for inputs orjson rejects, e.g. NaN)."""
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
 class LLMError(Exception):
     pass
 
@@ -38,9 +66,8 @@ class PermanentLLMError(LLMError):
     pass
 
 
-def _is_transient_error(exc: BaseException) -> bool:
-    name = type(exc).__name__
-    transient_names = {
+_TRANSIENT_NAMES = frozenset(
+    {
         "APIConnectionError",
         "APITimeoutError",
         "RateLimitError",
@@ -48,31 +75,133 @@ def _is_transient_error(exc: BaseException) -> bool:
         "APIStatusError",
         "APIError",
     }
-    if name in transient_names:
+)
+
+# One C-level scan instead of lower() + a Python-level any() over substrings.
+_TRANSIENT_MSG_RE = re.compile(
+    r"rate limit|timeout|timed out|temporarily|overload|50[023]|connection re(?:set|fused)|network",
+    re.IGNORECASE,
+)
+
+# Provider errors that mean response_format=json_object is not supported.
+_JSON_MODE_REJECT_RE = re.compile(
+    r"response_format|unknown parameter|unrecognized|invalid request",
+    re.IGNORECASE,
+)
+
+
+# Structural events for LLMClient._scan_balanced: a complete string literal (consumed in
+# one C-level match, escapes included), a bare quote (= unterminated string), or a bracket.
+_SCAN_EVENT_RE = {
+    "{": re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|["{}]', re.DOTALL),
+    "[": re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|["\[\]]', re.DOTALL),
+}
+
+
+_ANTHROPIC_PROMPT_CACHE_HEADERS = {"anthropic-beta": "prompt-caching-2024-07-31"}
+
+
+def _is_anthropic_endpoint(base_url: str) -> bool:
+    return "anthropic" in (base_url or "").lower()
+
+
+def _apply_prompt_cache(
+    config: LLMConfig, messages: list[dict[str, Any]]
+) -> tuple[list[dict[str, Any]], dict[str, str] | None]:
+    """
+    Rewrite a request so the provider can serve repeated prefixes from its prompt cache.
+
+    Only for config.prompt_cache on Anthropic-compatible endpoints:
+    - the system prompt (a class constant at every call site, so byte-identical across
+      calls) gets cache_control, which lets text-only calls such as the split request
+      reuse it whatever the per-document user turn holds;
+    - images are moved ahead of the text in each user message and the last one gets
+      cache_control, so system prompt + image form a stable prefix across different
+      questions about the same image.
+    OpenAI caches long identical prefixes automatically; the system prompt already
+    comes first, so requests are sent unchanged there.
+    """
+    if not config.prompt_cache or not _is_anthropic_endpoint(config.base_url):
+        return messages, None
+
+    rewritten: list[dict[str, Any]] = []
+    for message in messages:
+        content = message.get("content")
+        if message.get("role") == "system" and isinstance(content, str):
+            rewritten.append({
+                **message,
+                "content": [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}],
+            })
+            continue
+        if message.get("role") != "user" or not isinstance(content, list):
+            rewritten.append(message)
+            continue
+        images = [dict(part) for part in content if part.get("type") == "image_url"]
+        if not images:
+            rewritten.append(message)
+            continue
+        images[-1]["cache_control"] = {"type": "ephemeral"}
+        others = [part for part in content if part.get("type") != "image_url"]
+        rewritten.append({**message, "content": images + others})
+    return rewritten, _ANTHROPIC_PROMPT_CACHE_HEADERS
+
+
+def _is_transient_error(exc: BaseException) -> bool:
+    if type(exc).__name__ in _TRANSIENT_NAMES:
         return True
-    msg = str(exc).lower()
-    return any(
-        s in msg
-        for s in [
-            "rate limit",
-            "timeout",
-            "timed out",
-            "temporarily",
-            "overload",
-            "502",
-            "503",
-            "500",
-            "connection reset",
-            "connection refused",
-            "network",
-        ]
+    return _TRANSIENT_MSG_RE.search(str(exc)) is not None
+
+
+def _backoff_table(config: LLMConfig) -> tuple[float, ...]:
+    """Capped exponential backoff per attempt (index attempt - 1), computed once per client."""
+    return tuple(
+        min(config.max_retry_delay_s, config.base_retry_delay_s * (1 << i))
+        for i in range(max(1, config.max_retries))
     )
 
 
-def _retry_delay(attempt: int, base_s: float, max_s: float) -> float:
-    delay = min(max_s, base_s * (2 ** max(0, attempt - 1)))
-    jitter = random.uniform(0, min(1.0, delay * 0.1))
-    return delay + jitter
+def _retry_delay(backoff: tuple[float, ...], attempt: int) -> float:
+    delay = backoff[min(attempt, len(backoff)) - 1]
+    return delay + random.random() * min(1.0, delay * 0.1)
+
+
+def _image_data_url(image_bytes: bytes, image_mime: str) -> str:
+    """
+    Build a base64 data URL. The encoded bytes are appended to a bytearray that already
+    holds the header and decoded once, so the temporary base64 buffer can be freed
+    before the final str exists (no separate base64 str + f-string concat copy).
+    """
+    buf = bytearray(f"data:{image_mime};base64,".encode("ascii"))
+    buf += base64.b64encode(image_bytes)
+    return buf.decode("ascii")
+
+
+@functools.lru_cache(maxsize=32)
+def _system_prompt_digest(system_prompt: str) -> str:
+    """Short stable hash of a system prompt, used to scope semantic-cache entries."""
+    return hashlib.blake2b(system_prompt.encode("utf-8"), digest_size=8).hexdigest()
+
+
+# One keep-alive connection pool per (base_url, timeouts), shared by every LLMClient
+# (analyzer / splitter / formatter / agent each construct their own client).
+_HTTP_CLIENT_CACHE: dict[tuple[str, float, float], Any] = {}
+_HTTP_CLIENT_LOCK = threading.Lock()
+
+
+def _request_timeout(config: LLMConfig) -> Any:
+    """Fail fast on connect / pool waits; keep the full timeout_s budget for reading the reply."""
+    return Timeout(config.timeout_s, connect=config.connect_timeout_s, pool=config.connect_timeout_s)
+
+
+def _shared_http_client(config: LLMConfig) -> Any:
+    key = (config.base_url, float(config.timeout_s), float(config.connect_timeout_s))
+    with _HTTP_CLIENT_LOCK:
+        http_client = _HTTP_CLIENT_CACHE.get(key)
+        if http_client is None or http_client.is_closed:
+            # DefaultHttpxClient keeps the SDK's own limits / redirect defaults.
+            http_client = DefaultHttpxClient(timeout=_request_timeout(config))
+            _HTTP_CLIENT_CACHE[key] = http_client
+        return http_client
 
 
 @dataclass(frozen=True)
@@ -82,19 +211,24 @@ class ChatResult:
 
 
 class LLMClient:
+    __slots__ = ("config", "client", "_backoff", "_response_cache", "_semantic_cache")
+
     def __init__(self, config: LLMConfig):
-        try:
-            from openai import OpenAI  # type: ignore
-        except Exception as e:  # pragma: no cover
-            raise RuntimeError("Missing dependency: openai. Install with: pip install openai") from e
+        if OpenAI is None:  # pragma: no cover
+            raise RuntimeError("Missing dependency: openai. Install with: pip install openai")
 
         self.config = config
         self.client = OpenAI(
             api_key=config.api_key,
             base_url=config.base_url,
-            timeout=config.timeout_s,
+            timeout=_request_timeout(config),
             default_headers={"User-Agent": "Mozilla/5.0"},
+            http_client=_shared_http_client(config),
         )
+        self._backoff = _backoff_table(config)
+
+        self._response_cache = self._open_response_cache()
+        self._semantic_cache = self._open_semantic_cache()
 
         logger.info(
             "LLM client ready: model=%s base_url=%s api_key=%s",
@@ -103,6 +237,39 @@ class LLMClient:
             mask_secret(config.api_key),
         )
 
+    @staticmethod
+    def _open_response_cache() -> Any | None:
+        """Opt-in exact-match cache for temperature=0 calls (enabled by SKILL_LLM_CACHE_DIR)."""
+        cache_dir = os.getenv("SKILL_LLM_CACHE_DIR", "").strip()
+        if not cache_dir:
+            return None
+        try:
+            # Imported lazily: llm_cache imports ChatResult from this module.
+            try:
+                from .llm_cache import LLMResponseCache
+            except ImportError:
+                from llm_cache import LLMResponseCache
+            return LLMResponseCache(Path(cache_dir))
+        except Exception as e:
+            logger.warning("LLM response cache disabled: %s", e)
+            return None
+
+    @staticmethod
+    def _open_semantic_cache() -> Any | None:
+        """Opt-in similarity cache for temperature=0 text calls (SKILL_LLM_SEMANTIC_CACHE=1)."""
+        if os.getenv("SKILL_LLM_SEMANTIC_CACHE", "").strip() != "1":
+            return None
+        cache_dir = os.getenv("SKILL_LLM_CACHE_DIR", "").strip() or "output/.llm_cache"
+        try:
+            try:
+                from .semantic_cache import SemanticCache
+            except ImportError:
+                from semantic_cache import SemanticCache
+            return SemanticCache(Path(cache_dir))
+        except Exception as e:
+            logger.warning("Semantic cache disabled: %s", e)
+            return None
+
     def _call_chat(
         self,
         *,
@@ -114,6 +281,9 @@ class LLMClient:
         kwargs: dict[str, Any] = {}
         if json_mode:
             kwargs["response_format"] = {"type": "json_object"}
+        messages, extra_headers = _apply_prompt_cache(self.config, messages)
+        if extra_headers:
+            kwargs["extra_headers"] = extra_headers
 
         response = self.client.chat.completions.create(
             model=self.config.model,
@@ -128,6 +298,31 @@ class LLMClient:
             raise TransientLLMError("Empty response content")
         return ChatResult(content=content, raw=response)
 
+    def _cache_key(self, *, temperature: float, **parts: Any) -> str | None:
+        """Exact-match key for a request, or None when it must not be cached."""
+        # Only deterministic (temperature=0) calls are cached; sampled calls always hit the API.
+        if self._response_cache is None or temperature != 0:
+            return None
+        return self._response_cache.make_key(model=self.config.model, temperature=temperature, **parts)
+
+    def _cache_get(self, key: str | None) -> ChatResult | None:
+        if key is None:
+            return None
+        try:
+            cached = self._response_cache.get(key)
+        except Exception as e:
+            logger.warning("LLM cache read failed: %s", e)
+            return None
+        return ChatResult(content=cached, raw=None) if cached is not None else None
+
+    def _cache_set(self, key: str | None, result: ChatResult) -> None:
+        if key is None:
+            return
+        try:
+            self._response_cache.set(key, result.content)
+        except Exception as e:
+            logger.warning("LLM cache write failed: %s", e)
+
     def _call_with_retry(
         self,
         *,
@@ -137,6 +332,7 @@ class LLMClient:
         json_mode: bool,
     ) -> ChatResult:
         last_error: Exception | None = None
+        deadline = time.monotonic() + self.config.total_deadline_s
 
         for attempt in range(1, self.config.max_retries + 1):
             try:
@@ -154,10 +350,7 @@ class LLMClient:
                     raise PermanentLLMError(str(e)) from e
 
                 # JSON mode unsupported: retry once without json_mode.
-                msg = str(e).lower()
-                if json_mode and any(
-                    s in msg for s in ["response_format", "unknown parameter", "unrecognized", "invalid request"]
-                ):
+                if json_mode and _JSON_MODE_REJECT_RE.search(str(e)):
                     logger.warning("Provider rejected JSON mode; retrying once without json_mode.")
                     return self._call_chat(
                         messages=messages,
@@ -170,7 +363,14 @@ class LLMClient:
                     raise TransientLLMError(str(e)) from e
 
                 if _is_transient_error(e) or isinstance(e, TransientLLMError):
-                    delay = _retry_delay(attempt, self.config.base_retry_delay_s, self.config.max_retry_delay_s)
+                    delay = _retry_delay(self._backoff, attempt)
+                    if time.monotonic() + delay >= deadline:
+                        logger.warning(
+                            "LLM call exceeded its %.0fs deadline after %d attempt(s); giving up.",
+                            self.config.total_deadline_s,
+                            attempt,
+                        )
+                        raise TransientLLMError(str(e)) from e
                     logger.warning(
                         "Transient LLM error (%s). Retry %d/%d in %.1fs",
                         type(e).__name__,
@@ -194,16 +394,52 @@ class LLMClient:
         max_tokens: int = 4096,
         json_mode: bool = False,
     ) -> ChatResult:
+        # Cache lookups happen before any request payload is built.
+        key = self._cache_key(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=json_mode,
+        )
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        semantic = self._semantic_cache if temperature == 0 else None
+        if semantic is not None:
+            # 只比较 user_prompt；system prompt 以哈希进入 namespace，不同调用方永不互相命中
+            prompt = user_prompt
+            namespace = (
+                f"{self.config.model}|{max_tokens}|{'json' if json_mode else 'text'}"
+                f"|{_system_prompt_digest(system_prompt)}"
+            )
+            try:
+                cached = semantic.get(prompt, namespace)
+            except Exception as e:
+                logger.warning("Semantic cache lookup failed: %s", e)
+                cached = None
+            if cached is not None:
+                return ChatResult(content=cached, raw=None)
+
         messages: list[dict[str, Any]] = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ]
-        return self._call_with_retry(
+        result = self._call_with_retry(
             messages=messages,
             temperature=temperature,
             max_tokens=max_tokens,
             json_mode=json_mode,
         )
+        self._cache_set(key, result)
+
+        if semantic is not None:
+            try:
+                semantic.set(prompt, namespace, result.content)
+            except Exception as e:
+                logger.warning("Semantic cache store failed: %s", e)
+        return result
 
     def chat_with_image(
         self,
@@ -216,8 +452,20 @@ class LLMClient:
         max_tokens: int = 1200,
         json_mode: bool = False,
     ) -> ChatResult:
-        image_b64 = base64.b64encode(image_bytes).decode("ascii")
-        data_url = f"data:{image_mime};base64,{image_b64}"
+        key = self._cache_key(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=json_mode,
+            image_bytes=image_bytes,
+            image_mime=image_mime,
+        )
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        data_url = _image_data_url(image_bytes, image_mime)
 
         messages: list[dict[str, Any]] = [
             {"role": "system", "content": system_prompt},
@@ -229,12 +477,58 @@ class LLMClient:
                 ],
             },
         ]
-        return self._call_with_retry(
+        result = self._call_with_retry(
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=json_mode,
+        )
+        self._cache_set(key, result)
+        return result
+
+    def chat_with_images(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        images: list[bytes],
+        image_mime: str = "image/png",
+        temperature: float = 0.0,
+        max_tokens: int = 1200,
+        json_mode: bool = False,
+    ) -> ChatResult:
+        """Send several images in one user message (in order) after the text prompt."""
+        key = self._cache_key(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=json_mode,
+            image_mime=image_mime,
+            images=images,
+        )
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        content: list[dict[str, Any]] = [{"type": "text", "text": user_prompt}]
+        for image_bytes in images:
+            content.append(
+                {"type": "image_url", "image_url": {"url": _image_data_url(image_bytes, image_mime)}}
+            )
+
+        messages: list[dict[str, Any]] = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": content},
+        ]
+        result = self._call_with_retry(
             messages=messages,
             temperature=temperature,
             max_tokens=max_tokens,
             json_mode=json_mode,
         )
+        self._cache_set(key, result)
+        return result
 
     @staticmethod
     def _strip_code_fence(text: str) -> str:
@@ -248,51 +542,62 @@ class LLMClient:
             return "\n".join(lines[1:-1]).strip()
         return value
 
+    @staticmethod
+    def _scan_balanced(text: str, open_char: str, close_char: str) -> tuple[int, int] | None:
+        """
+        Return (start, end) of the first opener, in text order, that scanning from it closes.
+
+        Only structural events are visited: the regex skips plain text and whole string
+        literals in C, and the Python loop just tracks bracket depth. One pass also settles
+        every later opener it saw as structure (same tokens from there on), so a new pass is
+        only needed from the first opener the pass read as string content -- e.g. after a
+        stray quote such as 5" in prose before the real JSON.
+        """
+        pattern = _SCAN_EVENT_RE[open_char]
+        start = text.find(open_char)
+        while start != -1:
+            stack: list[int] = []
+            best: tuple[int, int] | None = None
+            rescan = -1  # first opener inside a string literal of this pass
+
+            for match in pattern.finditer(text, start):
+                token = match.group()
+                if token == open_char:
+                    stack.append(match.start())
+                elif token == close_char:
+                    if not stack:
+                        continue
+                    block_start = stack.pop()
+                    if not stack:
+                        # The pass's own opener closed: nothing can start earlier.
+                        return block_start, match.start()
+                    if best is None or block_start < best[0]:
+                        best = (block_start, match.start())
+                elif token == '"':
+                    # Unterminated string: the rest of the text is string content.
+                    if rescan == -1:
+                        rescan = text.find(open_char, match.end())
+                    break
+                elif rescan == -1 and open_char in token:
+                    rescan = match.start() + token.index(open_char)
+
+            if best is not None and (rescan == -1 or best[0] < rescan):
+                return best
+            start = rescan
+        return None
+
     @staticmethod
     def _extract_first_json_block(text: str) -> str | None:
         """Extract first balanced JSON object/array from text."""
         if not text:
             return None
 
-        def _scan(open_char: str, close_char: str) -> str | None:
-            start = text.find(open_char)
-            while start != -1:
-                depth = 0
-                in_string = False
-                escaped = False
-
-                for idx in range(start, len(text)):
-                    ch = text[idx]
-
-                    if in_string:
-                        if escaped:
-                            escaped = False
-                            continue
-                        if ch == "\\":
-                            escaped = True
-                            continue
-                        if ch == '"':
-                            in_string = False
-                        continue
-
-                    if ch == '"':
-                        in_string = True
-                        continue
-
-                    if ch == open_char:
-                        depth += 1
-                        continue
-
-                    if ch == close_char:
-                        depth -= 1
-                        if depth == 0:
-                            return text[start: idx + 1]
-
-                start = text.find(open_char, start + 1)
-            return None
-
         # Prefer object first, then array.
-        return _scan("{", "}") or _scan("[", "]")
+        span = LLMClient._scan_balanced(text, "{", "}") or LLMClient._scan_balanced(text, "[", "]")
+        if span is None:
+            return None
+        start, end = span
+        return text[start: end + 1]
 
     @staticmethod
     def parse_json(content: str, default: Any | None = None) -> Any:
@@ -303,20 +608,28 @@ class LLMClient:
                 return default
             raise ValueError("Empty JSON content")
 
-        candidates: list[str] = []
-
-        stripped = LLMClient._strip_code_fence(raw)
-        extracted_from_raw = LLMClient._extract_first_json_block(raw)
-        extracted_from_stripped = LLMClient._extract_first_json_block(stripped)
-
-        for candidate in [raw, stripped, extracted_from_raw, extracted_from_stripped]:
-            if candidate and candidate not in candidates:
-                candidates.append(candidate)
-
-        for candidate in candidates:
+        # Common case: the model already returned clean JSON.
+        try:
+            return _loads_json(raw)
+        except json.JSONDecodeError:
+            pass
+
+        def _candidates():
+            # Built lazily: each fallback costs a full scan, so stop at the first that parses.
+            stripped = LLMClient._strip_code_fence(raw)
+            yield stripped
+            yield LLMClient._extract_first_json_block(raw)
+            if stripped != raw:
+                yield LLMClient._extract_first_json_block(stripped)
+
+        seen: set[str] = {raw}
+        for candidate in _candidates():
+            if not candidate or candidate in seen:
+                continue
+            seen.add(candidate)
             try:
-                return json.loads(candidate)
-            except Exception:
+                return _loads_json(candidate)
+            except json.JSONDecodeError:
                 continue
 
         if default is not None:
@@ -327,6 +640,11 @@ class LLMClient:
 
     @staticmethod
     def to_json(obj: Any) -> str:
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+            except TypeError:
+                pass  # e.g. unsupported types; let the stdlib path decide
         try:
             return json.dumps(obj, ensure_ascii=False, indent=2)
         except Exception:
@@ -6,6 +6,7 @@ Prefer setting environment variables:
   - SKILL_LLM_API_KEY
   - SKILL_LLM_BASE_URL
   - SKILL_LLM_MODEL
+  - SKILL_LLM_PROMPT_CACHE=1 (optional, Anthropic-compatible endpoints only)
 
 Fallbacks:
   - OPENAI_API_KEY
@@ -18,6 +19,7 @@ Optional local debugging:
 
 from __future__ import annotations
 
+import functools
 import importlib.util
 import os
 from dataclasses import dataclass
@@ -44,7 +46,13 @@ def _load_legacy_config_dict(path: Path) -> dict:
     path = path.expanduser().resolve()
     if not path.exists():
         raise FileNotFoundError(path)
+    # Keyed on mtime so an edited file is re-executed; callers get their own copy.
+    return dict(_load_legacy_config_cached(str(path), path.stat().st_mtime_ns))
 
+
+@functools.lru_cache(maxsize=16)
+def _load_legacy_config_cached(path_str: str, mtime_ns: int) -> dict:
+    path = Path(path_str)
     spec = importlib.util.spec_from_file_location("skill_legacy_config", str(path))
     if spec is None or spec.loader is None:
         raise RuntimeError(f"Failed to load config: {path}")
@@ -67,6 +75,13 @@ class LLMConfig:
     max_retries: int = 5
     base_retry_delay_s: float = 1.0
     max_retry_delay_s: float = 20.0
+    # timeout_s is the per-request read budget (non-streaming replies arrive in one piece,
+    # so it must cover a full 4k-token generation); connecting fails much sooner.
+    connect_timeout_s: float = 5.0
+    # Wall-clock cap on one logical call including all retries and backoff sleeps.
+    total_deadline_s: float = 90.0
+    # Mark system prompts and image blocks cacheable on Anthropic-compatible endpoints (SKILL_LLM_PROMPT_CACHE=1).
+    prompt_cache: bool = False
 
     @classmethod
     def resolve(
@@ -80,6 +95,9 @@ class LLMConfig:
         max_retries: int | None = None,
         base_retry_delay_s: float | None = None,
         max_retry_delay_s: float | None = None,
+        connect_timeout_s: float | None = None,
+        total_deadline_s: float | None = None,
+        prompt_cache: bool | None = None,
     ) -> "LLMConfig":
         legacy: dict | None = None
         if legacy_config_path is not None:
@@ -114,4 +132,7 @@ class LLMConfig:
             max_retries=max(1, int(max_retries)) if max_retries is not None else 5,
             base_retry_delay_s=base_retry_delay_s if base_retry_delay_s is not None else 1.0,
             max_retry_delay_s=max_retry_delay_s if max_retry_delay_s is not None else 20.0,
+            connect_timeout_s=connect_timeout_s if connect_timeout_s is not None else 5.0,
+            total_deadline_s=total_deadline_s if total_deadline_s is not None else 90.0,
+            prompt_cache=prompt_cache if prompt_cache is not None else _first_env("SKILL_LLM_PROMPT_CACHE") == "1",
         )
@@ -6,11 +6,14 @@
 因为小红书会自动吞掉普通的空行。
 """
 
+from functools import lru_cache
+from types import MappingProxyType
+
 # 盲文空格 - 小红书不会吞掉的空白字符
 BRAILLE_BLANK = '⠀'  # U+2800
 
 # 分隔线样式
-DIVIDERS = {
+DIVIDERS = MappingProxyType({
     'thin': '━' * 20,
     'double': '═' * 20,
     'dotted': '·' * 20,
@@ -19,23 +22,23 @@ DIVIDERS = {
     'heart': '♡' * 10,
     'diamond': '◇' * 10,
     'arrow': '➤' * 10,
-}
+})
 
 # 数字 emoji (1-10)
-NUMBER_EMOJIS = ['1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣', '6️⃣', '7️⃣', '8️⃣', '9️⃣', '🔟']
+NUMBER_EMOJIS = ('1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣', '6️⃣', '7️⃣', '8️⃣', '9️⃣', '🔟')
 
 # 重点标记
-EMPHASIS_MARKS = {
+EMPHASIS_MARKS = MappingProxyType({
     'bracket': ('【', '】'),
     'star': ('⭐', '⭐'),
     'fire': ('🔥', '🔥'),
     'point': ('👉', ''),
     'check': ('✅', ''),
     'spark': ('✨', '✨'),
-}
+})
 
 # 列表项标记
-LIST_MARKERS = {
+LIST_MARKERS = MappingProxyType({
     'dot': '•',
     'star': '★',
     'arrow': '➜',
@@ -43,19 +46,19 @@ LIST_MARKERS = {
     'diamond': '◆',
     'heart': '♥',
     'flower': '❀',
-}
+})
 
 # 引用标记
-QUOTE_MARKS = {
+QUOTE_MARKS = MappingProxyType({
     'line': '｜',
     'double_line': '‖',
     'bracket': '「',
     'bracket_end': '」',
     'guillemet': '»',
-}
+})
 
 # 小红书推荐的标题装饰
-TITLE_DECORATIONS = [
+TITLE_DECORATIONS = (
     ('📝', ''),
     ('💡', ''),
     ('🎯', ''),
@@ -63,15 +66,15 @@ TITLE_DECORATIONS = [
     ('🔖', ''),
     ('✨', '✨'),
     ('🌟', '🌟'),
-]
+)
 
 # 结尾装饰
-ENDING_DECORATIONS = [
+ENDING_DECORATIONS = (
     '感谢阅读 ❤️',
     '喜欢请点赞收藏 🙏',
     '关注我获取更多内容 ✨',
     '有问题评论区见 💬',
-]
+)
 
 # 常用标签前缀
 TAG_PREFIX = '#'
@@ -82,10 +85,13 @@ BLANK_LINE = BRAILLE_BLANK
 # 段落间隔模板
 PARAGRAPH_SEPARATOR = f"\n{BRAILLE_BLANK}\n"
 
-# 格式化函数
+# 格式化函数（常量均为只读，结果可安全缓存）
+@lru_cache(maxsize=32)
 def make_blank_lines(count: int = 1) -> str:
     """生成指定数量的空行（使用盲文空格）"""
-    return '\n'.join([BRAILLE_BLANK] * count)
+    if count == 1:
+        return BRAILLE_BLANK
+    return '\n'.join((BRAILLE_BLANK,) * count)
 
 
 def make_numbered_item(index: int, text: str) -> str:
@@ -101,6 +107,7 @@ def make_emphasis(text: str, style: str = 'bracket') -> str:
     return f"{marks[0]}{text}{marks[1]}"
 
 
+@lru_cache(maxsize=32)
 def make_divider(style: str = 'thin') -> str:
     """生成分隔线"""
     return DIVIDERS.get(style, DIVIDERS['thin'])
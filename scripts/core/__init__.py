@@ -3,7 +3,7 @@ from .markdown_parser import MarkdownParser, ParsedMarkdown, ContentBlock
 from .image_analyzer import ImageAnalyzer, ImageAnalysis
 from .content_splitter import ContentSplitter, PageContent
 from .rednote_formatter import RedNoteFormatter
-from .preview_renderer import PreviewRenderer
+from .preview_renderer import PreviewRenderer, CachedPreviewRenderer
 
 __all__ = [
     "MarkdownParser",
@@ -15,4 +15,5 @@ __all__ = [
     "PageContent",
     "RedNoteFormatter",
     "PreviewRenderer",
+    "CachedPreviewRenderer",
 ]
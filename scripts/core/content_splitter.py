@@ -7,17 +7,24 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import os
+import sqlite3
+import threading
+import time
 from dataclasses import dataclass, field
-from typing import Optional
+from pathlib import Path
+from typing import Any, Optional
 
-from .markdown_parser import ParsedMarkdown, ContentBlock, BlockType
+from .markdown_parser import ParsedMarkdown, ContentBlock, BlockType, blocks_to_text
 from .image_analyzer import ImageAnalysis
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class PageContent:
     """单页内容"""
     page_number: int
@@ -25,28 +32,129 @@ class PageContent:
     images: list[ImageAnalysis]
     char_count: int
     is_cover: bool = False
+    _text_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def text_content(self) -> str:
-        """获取纯文本内容"""
-        texts = []
-        for block in self.blocks:
-            if block.type == BlockType.IMAGE:
-                continue
-            if block.type == BlockType.LIST:
-                texts.extend(block.items)
-            else:
-                texts.append(block.content)
-        return "\n".join(texts)
-
-
-@dataclass
+        """获取纯文本内容，首次计算后缓存"""
+        if self._text_cache is None:
+            self._text_cache = blocks_to_text(self.blocks)
+        return self._text_cache
+
+
+@dataclass(slots=True)
 class SplitPlan:
     """分割计划"""
     pages: list[dict]  # 每页包含的块索引和图片索引
     reasoning: str
 
 
+class SplitPlanCache:
+    """
+    LLM 分页方案缓存（线程安全，首次使用时才打开数据库）
+
+    - 精确匹配：SQLite，键为 sha256(提示词版本/模型 + 内容摘要)，条目 ttl_s 后过期（打开数据库时清理）
+    - 语义匹配（可选，SKILL_LLM_SEMANTIC_CACHE=1 且装有 numpy + sentence-transformers）：
+      摘要向量相似度 >= SEMANTIC_THRESHOLD，且块数相同、总字数相差不超过 CHARS_TOLERANCE
+      时复用方案（方案按块索引描述，块数不同的文档不能共用）
+    """
+
+    DB_NAME = "split_plans.sqlite3"
+    SEMANTIC_DIR = "split_plans_semantic"
+    DEFAULT_TTL_S = 7 * 24 * 3600
+    SEMANTIC_THRESHOLD = 0.95
+    CHARS_TOLERANCE = 0.10
+
+    def __init__(self, cache_dir: Path, ttl_s: float = DEFAULT_TTL_S, semantic: Optional[bool] = None):
+        self.cache_dir = Path(cache_dir)
+        self.path = self.cache_dir / self.DB_NAME
+        self.ttl_s = ttl_s
+        if semantic is None:
+            semantic = os.getenv("SKILL_LLM_SEMANTIC_CACHE", "").strip() == "1"
+        self._semantic_enabled = semantic
+        self._semantic: Any = None
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS plans ("
+                "key TEXT PRIMARY KEY, plan TEXT NOT NULL, total_chars INTEGER NOT NULL, "
+                "block_count INTEGER NOT NULL, created_at INTEGER NOT NULL)"
+            )
+            # 过期方案在读取时已被忽略，打开时顺带删除，避免数据库无限增长
+            conn.execute("DELETE FROM plans WHERE created_at < ?", (int(time.time() - self.ttl_s),))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _semantic_cache(self) -> Any:
+        """按需创建语义缓存；依赖缺失时记录一次警告并关闭语义层"""
+        if not self._semantic_enabled:
+            return None
+        if self._semantic is None:
+            try:
+                try:
+                    from ..semantic_cache import SemanticCache
+                except ImportError:
+                    from semantic_cache import SemanticCache
+                self._semantic = SemanticCache(
+                    self.cache_dir / self.SEMANTIC_DIR,
+                    threshold=self.SEMANTIC_THRESHOLD,
+                    ttl=self.ttl_s,
+                )
+            except Exception as e:
+                logger.warning(f"Semantic split-plan cache disabled: {e}")
+                self._semantic_enabled = False
+                return None
+        return self._semantic
+
+    def get(self, key: str, scope: str, summary: str, total_chars: int, block_count: int) -> Optional[dict]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT plan FROM plans WHERE key = ? AND created_at >= ?",
+                (key, int(time.time() - self.ttl_s)),
+            ).fetchone()
+        if row:
+            return json.loads(row[0])
+
+        semantic = self._semantic_cache()
+        if semantic is None:
+            return None
+        cached = semantic.get(summary, scope)
+        if cached is None:
+            return None
+        entry = json.loads(cached)
+        if entry.get("block_count") != block_count:
+            return None
+        if abs(entry.get("total_chars", 0) - total_chars) > total_chars * self.CHARS_TOLERANCE:
+            return None
+        logger.info("Split plan semantic cache hit")
+        return entry.get("plan")
+
+    def set(self, key: str, scope: str, summary: str, total_chars: int, block_count: int, plan: dict) -> None:
+        payload = json.dumps(plan, ensure_ascii=False)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO plans (key, plan, total_chars, block_count, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, total_chars, block_count, int(time.time())),
+            )
+            conn.commit()
+
+        semantic = self._semantic_cache()
+        if semantic is not None:
+            semantic.set(summary, scope, json.dumps(
+                {"plan": plan, "total_chars": total_chars, "block_count": block_count},
+                ensure_ascii=False,
+            ))
+
+
 class ContentSplitter:
     """智能内容分割器"""
 
@@ -55,6 +163,10 @@ class ContentSplitter:
     MAX_CHARS = 450    # 最大字数
     MIN_CHARS = 120    # 最小字数（避免页面过短）
 
+    # 中等篇幅且块数少的文档，LLM 分页很少比顺序分页更好，直接走 _simple_split 省一次调用
+    LLM_SPLIT_MIN_CHARS = MAX_CHARS * 2
+    LLM_SPLIT_MIN_BLOCKS = 8
+
     SPLIT_SYSTEM_PROMPT = """你是小红书内容分割专家。把长文拆成多个短页，每页 250-400 字。
 
 分割原则：
@@ -71,51 +183,88 @@ class ContentSplitter:
     "reasoning": "简短理由"
 }"""
 
-    def __init__(self, llm_client):
+    # 用户消息的固定引导语；系统提示词保持逐字节不变，便于服务端前缀缓存命中
+    SPLIT_USER_PREFIX = "请分析以下内容并给出分页方案：\n\n"
+
+    # 提示词变更时自动让旧的分页方案缓存失效
+    PROMPT_VERSION = hashlib.sha1(SPLIT_SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:8]
+
+    def __init__(self, llm_client, cache_dir: Optional[Path] = None, refresh: bool = False):
         """
         初始化分割器
 
         Args:
             llm_client: LLMClient 实例
+            cache_dir: 分页方案缓存目录（None 表示不缓存）
+            refresh: 跳过缓存读取（新方案仍会写入）
         """
         self.llm_client = llm_client
+        self.plan_cache = SplitPlanCache(cache_dir) if cache_dir is not None else None
+        self.refresh = refresh
+
+    def _request_plan(self, parsed: ParsedMarkdown, summary: str) -> tuple[dict, Optional[tuple]]:
+        """
+        取分页方案：先查缓存，未命中再调用 LLM
+
+        Returns:
+            (方案字典, 方案被采用后写缓存所需的参数；缓存命中或未启用缓存时为 None)
+        """
+        user_prompt = self.SPLIT_USER_PREFIX + summary
+        store_args: Optional[tuple] = None
+
+        if self.plan_cache is not None:
+            config = getattr(self.llm_client, 'config', None)
+            scope = f"{self.PROMPT_VERSION}|{getattr(config, 'model', '')}"
+            key = hashlib.sha256(f"{scope}\n{user_prompt}".encode("utf-8")).hexdigest()
+            store_args = (key, scope, summary, parsed.total_chars, len(parsed.blocks))
+            if not self.refresh:
+                try:
+                    cached = self.plan_cache.get(*store_args)
+                except (sqlite3.Error, ValueError) as e:
+                    logger.warning(f"Split plan cache read failed: {e}")
+                    cached = None
+                if isinstance(cached, dict):
+                    logger.info("Split plan cache hit")
+                    return cached, None
+
+        result = self.llm_client.chat_text(
+            system_prompt=self.SPLIT_SYSTEM_PROMPT,
+            user_prompt=user_prompt,
+            temperature=0.3,
+            max_tokens=1000,
+            json_mode=True,
+        )
+        plan_data = self.llm_client.parse_json(result.content, default={})
+        return (plan_data if isinstance(plan_data, dict) else {}), store_args
 
     def _estimate_block_chars(self, block: ContentBlock) -> int:
         """估算内容块字数"""
-        if block.type == BlockType.IMAGE:
-            return 0
-        if block.type == BlockType.LIST:
-            return sum(len(item) for item in block.items)
-        return len(block.content)
+        return block.char_count
+
+    @staticmethod
+    def _images_by_path(image_analyses: list[ImageAnalysis]) -> dict[str, ImageAnalysis]:
+        """路径 -> 分析结果（每次 split 只构建一次，供各页复用）"""
+        return {str(img.path): img for img in image_analyses}
 
     @staticmethod
     def _collect_images_for_blocks(
         blocks: list[ContentBlock],
         image_analyses: list[ImageAnalysis],
+        by_path: Optional[dict[str, ImageAnalysis]] = None,
     ) -> list[ImageAnalysis]:
         """Collect page images from image blocks in the same order as markdown."""
         if not image_analyses:
             return []
 
-        by_path = {str(img.path): img for img in image_analyses}
-        images: list[ImageAnalysis] = []
-        seen: set[str] = set()
-
-        for block in blocks:
-            if block.type != BlockType.IMAGE or not block.image_ref:
-                continue
-            path = str(block.image_ref.path)
-            if path in seen:
-                continue
-
-            analysis = by_path.get(path)
-            if analysis is None:
-                continue
-
-            images.append(analysis)
-            seen.add(path)
-
-        return images
+        if by_path is None:
+            by_path = ContentSplitter._images_by_path(image_analyses)
+        # dict.fromkeys: de-duplicate paths while keeping first-seen order
+        ordered_paths = dict.fromkeys(
+            block.image_ref.path
+            for block in blocks
+            if block.type == BlockType.IMAGE and block.image_ref
+        )
+        return [by_path[path] for path in ordered_paths if path in by_path]
 
     def _build_content_summary(
         self,
@@ -126,12 +275,12 @@ class ContentSplitter:
         summary_parts = ["内容块列表："]
 
         for i, block in enumerate(parsed.blocks):
-            chars = self._estimate_block_chars(block)
+            chars = block.char_count
             if block.type == BlockType.HEADING:
                 summary_parts.append(f"[{i}] 标题(H{block.level}): {block.content[:50]}... ({chars}字)")
             elif block.type == BlockType.PARAGRAPH:
-                preview = block.content[:100] + "..." if len(block.content) > 100 else block.content
-                summary_parts.append(f"[{i}] 段落: {preview} ({chars}字)")
+                ellipsis = "..." if len(block.content) > 100 else ""
+                summary_parts.append(f"[{i}] 段落: {block.content[:100]}{ellipsis} ({chars}字)")
             elif block.type == BlockType.LIST:
                 summary_parts.append(f"[{i}] 列表({len(block.items)}项): {chars}字")
             elif block.type == BlockType.QUOTE:
@@ -144,33 +293,35 @@ class ContentSplitter:
                 summary_parts.append(f"[{i}] 分隔线")
 
         summary_parts.append("\n图片分析结果：")
-        for i, img in enumerate(image_analyses):
-            summary_parts.append(
-                f"[{i}] {img.description} (建议位置: {img.suggested_position}, 情感: {img.mood})"
-            )
+        summary_parts.extend(
+            f"[{i}] {img.description} (建议位置: {img.suggested_position}, 情感: {img.mood})"
+            for i, img in enumerate(image_analyses)
+        )
 
-        total_chars = sum(self._estimate_block_chars(b) for b in parsed.blocks)
-        summary_parts.append(f"\n总字数: {total_chars}")
+        summary_parts.append(f"\n总字数: {parsed.total_chars}")
 
         return "\n".join(summary_parts)
 
     def _simple_split(
         self,
         parsed: ParsedMarkdown,
-        image_analyses: list[ImageAnalysis]
+        image_analyses: list[ImageAnalysis],
+        by_path: Optional[dict[str, ImageAnalysis]] = None,
     ) -> list[PageContent]:
         """简单分割（当 LLM 不可用时的回退方案）"""
+        if by_path is None:
+            by_path = self._images_by_path(image_analyses)
         pages: list[PageContent] = []
         current_blocks: list[ContentBlock] = []
         current_chars = 0
         page_num = 1
 
         for block in parsed.blocks:
-            block_chars = self._estimate_block_chars(block)
+            block_chars = block.char_count
 
             # 检查是否需要新页
             if current_chars + block_chars > self.MAX_CHARS and current_blocks:
-                page_images = self._collect_images_for_blocks(current_blocks, image_analyses)
+                page_images = self._collect_images_for_blocks(current_blocks, image_analyses, by_path)
 
                 pages.append(PageContent(
                     page_number=page_num,
@@ -188,7 +339,7 @@ class ContentSplitter:
 
         # 最后一页
         if current_blocks:
-            page_images = self._collect_images_for_blocks(current_blocks, image_analyses)
+            page_images = self._collect_images_for_blocks(current_blocks, image_analyses, by_path)
 
             pages.append(PageContent(
                 page_number=page_num,
@@ -237,10 +388,12 @@ class ContentSplitter:
         Returns:
             PageContent 列表
         """
+        by_path = self._images_by_path(image_analyses)
+
         # 如果内容很短，不需要分页
-        total_chars = sum(self._estimate_block_chars(b) for b in parsed.blocks)
+        total_chars = parsed.total_chars
         if total_chars <= self.MAX_CHARS:
-            page_images = self._collect_images_for_blocks(parsed.blocks, image_analyses)
+            page_images = self._collect_images_for_blocks(parsed.blocks, image_analyses, by_path)
             return [PageContent(
                 page_number=1,
                 blocks=parsed.blocks,
@@ -250,25 +403,21 @@ class ContentSplitter:
             )]
 
         if not use_llm or self.llm_client is None:
-            return self._simple_split(parsed, image_analyses)
+            return self._simple_split(parsed, image_analyses, by_path)
+
+        if total_chars <= self.LLM_SPLIT_MIN_CHARS and len(parsed.blocks) <= self.LLM_SPLIT_MIN_BLOCKS:
+            logger.debug(
+                f"Skipping LLM split for short document ({total_chars} chars, {len(parsed.blocks)} blocks)"
+            )
+            return self._simple_split(parsed, image_analyses, by_path)
 
         # 使用 LLM 智能分割
         try:
             summary = self._build_content_summary(parsed, image_analyses)
-
-            result = self.llm_client.chat_text(
-                system_prompt=self.SPLIT_SYSTEM_PROMPT,
-                user_prompt=f"请分析以下内容并给出分页方案：\n\n{summary}",
-                temperature=0.3,
-                max_tokens=1000,
-                json_mode=True,
-            )
-
-            plan_data = self.llm_client.parse_json(result.content, default={})
-            if not isinstance(plan_data, dict):
-                plan_data = {}
+            plan_data, store_args = self._request_plan(parsed, summary)
             pages: list[PageContent] = []
 
+            block_count = len(parsed.blocks)
             used_indices: set[int] = set()
             normalized_pages: list[list[int]] = []
 
@@ -280,28 +429,18 @@ class ContentSplitter:
                 if not isinstance(block_indices, list):
                     continue
 
-                normalized_indices: list[int] = []
-                for raw_idx in block_indices:
-                    idx_val: Optional[int] = None
-                    if isinstance(raw_idx, int):
-                        idx_val = raw_idx
-                    elif isinstance(raw_idx, str) and raw_idx.strip().isdigit():
-                        idx_val = int(raw_idx.strip())
-
-                    if idx_val is None:
-                        continue
-                    if not (0 <= idx_val < len(parsed.blocks)):
-                        continue
-                    if idx_val in used_indices:
-                        continue
-                    normalized_indices.append(idx_val)
-                    used_indices.add(idx_val)
-
-                if normalized_indices:
-                    normalized_indices.sort()
-                    normalized_pages.append(normalized_indices)
-
-            missing_indices = [idx for idx in range(len(parsed.blocks)) if idx not in used_indices]
+                # 整数或纯数字字符串；越界、本页重复、已被前面页面占用的索引都丢弃
+                ints = [
+                    raw_idx if isinstance(raw_idx, int) else int(raw_idx)
+                    for raw_idx in block_indices
+                    if isinstance(raw_idx, int) or (isinstance(raw_idx, str) and raw_idx.strip().isdigit())
+                ]
+                valid = {idx for idx in ints if 0 <= idx < block_count} - used_indices
+                if valid:
+                    used_indices |= valid
+                    normalized_pages.append(sorted(valid))
+
+            missing_indices = sorted(set(range(block_count)) - used_indices)
             if missing_indices:
                 if normalized_pages:
                     normalized_pages[-1].extend(missing_indices)
@@ -310,9 +449,9 @@ class ContentSplitter:
 
             for i, block_indices in enumerate(normalized_pages):
                 page_blocks = [parsed.blocks[idx] for idx in block_indices]
-                page_images = self._collect_images_for_blocks(page_blocks, image_analyses)
+                page_images = self._collect_images_for_blocks(page_blocks, image_analyses, by_path)
 
-                char_count = sum(self._estimate_block_chars(b) for b in page_blocks)
+                char_count = sum(b.char_count for b in page_blocks)
 
                 pages.append(PageContent(
                     page_number=i + 1,
@@ -324,9 +463,15 @@ class ContentSplitter:
 
             if self._is_split_plan_reasonable(pages, total_chars):
                 logger.info(f"LLM split into {len(pages)} pages: {plan_data.get('reasoning', '')}")
+                if store_args is not None:
+                    # 只缓存通过质量检查的方案
+                    try:
+                        self.plan_cache.set(*store_args, plan_data)
+                    except (sqlite3.Error, OSError) as e:
+                        logger.warning(f"Split plan cache write failed: {e}")
                 return pages
 
         except Exception as e:
             logger.warning(f"LLM split failed, using simple split: {e}")
 
-        return self._simple_split(parsed, image_analyses)
+        return self._simple_split(parsed, image_analyses, by_path)
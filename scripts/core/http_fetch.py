@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+带连接复用的 HTTP GET
+
+urllib.request.urlopen 每次都新建 TCP + TLS 连接；同一 Markdown 里的图片通常来自同一个图床，
+这里按 (scheme, host) 保留空闲的 keep-alive 连接，后续下载省掉握手。
+仅依赖标准库（http.client），线程安全；配置了系统代理时回退到 urlopen。
+"""
+
+from __future__ import annotations
+
+import http.client
+import logging
+import os
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Optional
+from urllib.parse import urljoin, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# 复用连接时对端可能已关闭，这些错误换一条新连接重试一次
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+_REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+
+
+class KeepAliveFetcher:
+    """
+    按主机复用连接的 GET 下载器
+
+    - 空闲连接按 (scheme, netloc) 存放，每个主机最多保留 max_idle_per_host 条
+    - 跟随重定向（最多 max_redirects 次）
+    - 502/503/504 按指数退避重试 retries 次
+    """
+
+    RETRY_STATUSES = frozenset({502, 503, 504})
+
+    def __init__(
+        self,
+        max_idle_per_host: int = 8,
+        retries: int = 2,
+        backoff_s: float = 0.3,
+        max_redirects: int = 5,
+    ):
+        self.max_idle_per_host = max_idle_per_host
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.max_redirects = max_redirects
+        self._idle: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+
+    def _acquire_new(self, scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(netloc, timeout=timeout)
+
+    def _acquire(self, scheme: str, netloc: str, timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        """取一条空闲连接（reused=True）或新建连接"""
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            conn = idle.pop() if idle else None
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        return self._acquire_new(scheme, netloc, timeout), False
+
+    def _release(self, scheme: str, netloc: str, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _request_once(
+        self, scheme: str, netloc: str, target: str, headers: dict[str, str], timeout: float
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        conn, reused = self._acquire(scheme, netloc, timeout)
+        try:
+            try:
+                conn.request('GET', target, headers=headers)
+                resp = conn.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # 复用的连接已被服务端关闭：换新连接重试一次
+                conn.close()
+                conn = self._acquire_new(scheme, netloc, timeout)
+                conn.request('GET', target, headers=headers)
+                resp = conn.getresponse()
+            body = resp.read()
+        except BaseException:
+            conn.close()
+            raise
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(scheme, netloc, conn)
+        return resp.status, resp.headers, body
+
+    @staticmethod
+    def _uses_proxy(scheme: str, host: str) -> bool:
+        proxies = urllib.request.getproxies()
+        return scheme in proxies and not urllib.request.proxy_bypass(host)
+
+    def get(self, url: str, *, timeout: float = 15, headers: Optional[dict[str, str]] = None) -> tuple[bytes, str]:
+        """
+        GET 请求
+
+        Returns:
+            (响应体, Content-Type)
+
+        Raises:
+            urllib.error.HTTPError: 非 2xx 响应（重试 / 重定向之后）
+            OSError: 网络错误
+        """
+        request_headers = {'User-Agent': 'Mozilla/5.0', 'Accept-Encoding': 'identity'}
+        if headers:
+            request_headers.update(headers)
+
+        current = url
+        redirects = 0
+        attempt = 0
+        while True:
+            parts = urlsplit(current)
+            scheme = parts.scheme.lower()
+            if scheme not in ('http', 'https') or self._uses_proxy(scheme, parts.hostname or ''):
+                req = urllib.request.Request(current, headers=request_headers)
+                with urllib.request.urlopen(req, timeout=timeout) as resp:
+                    return resp.read(), resp.headers.get('Content-Type', '')
+
+            target = parts.path or '/'
+            if parts.query:
+                target = f"{target}?{parts.query}"
+            status, response_headers, body = self._request_once(
+                scheme, parts.netloc, target, request_headers, timeout
+            )
+
+            if status in _REDIRECT_STATUSES and response_headers.get('Location'):
+                redirects += 1
+                if redirects > self.max_redirects:
+                    raise urllib.error.HTTPError(current, status, 'Too many redirects', response_headers, None)
+                current = urljoin(current, response_headers['Location'])
+                continue
+
+            if status in self.RETRY_STATUSES and attempt < self.retries:
+                delay = self.backoff_s * (2 ** attempt)
+                attempt += 1
+                logger.debug(f"HTTP {status} for {current[:80]}, retry {attempt}/{self.retries} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if not 200 <= status < 300:
+                raise urllib.error.HTTPError(current, status, f"HTTP {status}", response_headers, None)
+            return body, response_headers.get('Content-Type', '')
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+_default_fetcher: Optional[KeepAliveFetcher] = None
+_default_lock = threading.Lock()
+
+
+def get_default_fetcher() -> KeepAliveFetcher:
+    """进程内共享的下载器（各模块下载图片时复用同一组连接）"""
+    global _default_fetcher
+    with _default_lock:
+        if _default_fetcher is None:
+            _default_fetcher = KeepAliveFetcher()
+        return _default_fetcher
+
+
+def _reset_after_fork() -> None:
+    """
+    fork 出的子进程（如 ProcessPoolExecutor 的渲染 worker）不沿用父进程的下载器：
+    空闲连接的套接字与父进程共享，锁也可能在 fork 时正被其他线程持有。
+    这里只丢弃引用、不 close，避免影响父进程仍在使用的连接。
+    """
+    global _default_fetcher, _default_lock
+    _default_fetcher = None
+    _default_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -7,8 +7,15 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import inspect
+import json
 import logging
-import urllib.request
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, Literal
@@ -17,10 +24,13 @@ from urllib.parse import urlparse
 from PIL import Image
 import io
 
+from .http_fetch import get_default_fetcher
+from .markdown_parser import _URL_PREFIXES
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ImageAnalysis:
     """图片分析结果"""
     path: str
@@ -43,6 +53,103 @@ class ImageAnalysis:
         return 0.9 <= self.aspect_ratio <= 1.1
 
 
+class ImageAnalysisCache:
+    """
+    图片分析结果的本地 SQLite 缓存（线程安全，首次使用时才打开数据库）
+
+    两级查找：
+    - 精确匹配：sha256(图片字节 + MIME + 提示词版本/模型)
+    - 感知匹配：64 位 dHash，取汉明距离最近且 <= PERCEPTUAL_MAX_DISTANCE 的一条
+      （重新压缩、缩放过的同一图片也能命中）
+
+    感知表以 (scope, dhash) 为唯一键，每个 scope 最多保留 PERCEPTUAL_MAX_ROWS 条（超出时淘汰最旧的）。
+    只保存模型给出的字段（description/mood/tags/suggested_position），
+    尺寸等信息每次按实际图片重新计算。
+    """
+
+    DB_NAME = "image_analysis.sqlite3"
+    PERCEPTUAL_MAX_DISTANCE = 6
+    PERCEPTUAL_MAX_ROWS = 2000
+
+    def __init__(self, cache_dir: Path):
+        self.path = Path(cache_dir) / self.DB_NAME
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS exact ("
+                "key TEXT PRIMARY KEY, data TEXT NOT NULL, created_at INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS similar ("
+                "scope TEXT NOT NULL, dhash INTEGER NOT NULL, data TEXT NOT NULL, created_at INTEGER NOT NULL, "
+                "UNIQUE (scope, dhash))"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _to_signed(value: int) -> int:
+        """SQLite INTEGER 为有符号 64 位"""
+        return value - (1 << 64) if value >= (1 << 63) else value
+
+    def get_exact(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._connection().execute("SELECT data FROM exact WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_similar(self, scope: str, dhash: int) -> Optional[dict]:
+        """取同一 scope 下汉明距离最近的感知匹配（超过 PERCEPTUAL_MAX_DISTANCE 视为未命中）"""
+        target = self._to_signed(dhash)
+        with self._lock:
+            stored = [
+                value for (value,) in
+                self._connection().execute("SELECT dhash FROM similar WHERE scope = ?", (scope,))
+            ]
+        # 只取出哈希值，距离计算在锁外进行
+        best, best_distance = None, self.PERCEPTUAL_MAX_DISTANCE + 1
+        for value in stored:
+            distance = ((value ^ target) & 0xFFFFFFFFFFFFFFFF).bit_count()
+            if distance < best_distance:
+                best, best_distance = value, distance
+                if distance == 0:
+                    break
+        if best is None:
+            return None
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT data FROM similar WHERE scope = ? AND dhash = ?", (scope, best)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, scope: str, dhash: Optional[int], data: dict) -> None:
+        payload = json.dumps(data, ensure_ascii=False)
+        now = int(time.time())
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO exact (key, data, created_at) VALUES (?, ?, ?)",
+                (key, payload, now),
+            )
+            if dhash is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO similar (scope, dhash, data, created_at) VALUES (?, ?, ?, ?)",
+                    (scope, self._to_signed(dhash), payload, now),
+                )
+                conn.execute(
+                    "DELETE FROM similar WHERE scope = ? AND rowid NOT IN ("
+                    "SELECT rowid FROM similar WHERE scope = ? ORDER BY created_at DESC, rowid DESC LIMIT ?)",
+                    (scope, scope, self.PERCEPTUAL_MAX_ROWS),
+                )
+            conn.commit()
+
+
 class ImageAnalyzer:
     """多模态图片分析器"""
 
@@ -69,37 +176,80 @@ class ImageAnalyzer:
     "suggested_position": "cover|inline|ending"
 }"""
 
-    def __init__(self, llm_client):
+    BATCH_SYSTEM_PROMPT = """你是一个图片分析专家，专门为小红书内容创作提供图片分析服务。
+
+用户会按顺序发送多张图片，请逐张分析，每张图片给出以下字段：
+- index: 图片序号（从 1 开始，与发送顺序一致）
+- description: 图片内容的简短描述（中文，20-50字）
+- mood: 图片的情感氛围，只能是以下之一：warm（温暖）、cool（冷静）、vibrant（活力）、neutral（中性）
+- tags: 3-5个相关标签（中文）
+- suggested_position: 建议在小红书帖子中的位置，只能是以下之一：cover、inline、ending
+
+只返回JSON，不要其他内容。"""
+
+    BATCH_USER_PROMPT = """以下共 {count} 张图片，请按顺序逐张分析，为小红书内容创作提供建议。
+
+返回格式：
+{{
+    "images": [
+        {{"index": 1, "description": "图片描述", "mood": "warm|cool|vibrant|neutral", "tags": ["标签1", "标签2"], "suggested_position": "cover|inline|ending"}}
+    ]
+}}"""
+
+    # 提示词变更时自动让旧缓存失效
+    PROMPT_VERSION = hashlib.sha1(
+        (ANALYSIS_SYSTEM_PROMPT + ANALYSIS_USER_PROMPT + BATCH_SYSTEM_PROMPT + BATCH_USER_PROMPT).encode("utf-8")
+    ).hexdigest()[:8]
+
+    MIME_BY_SUFFIX = {
+        '.jpg': 'image/jpeg',
+        '.jpeg': 'image/jpeg',
+        '.png': 'image/png',
+        '.gif': 'image/gif',
+        '.webp': 'image/webp',
+    }
+
+    # 发给视觉模型前的最长边上限（分析只需语义内容，超大原图只会多耗带宽和图片 token）
+    VLM_MAX_EDGE = 1024
+    VLM_JPEG_QUALITY = 85
+
+    DEFAULT_MAX_CONCURRENCY = 8
+    DEFAULT_BATCH_SIZE = 4
+
+    def __init__(
+        self,
+        llm_client,
+        cache_dir: Optional[Path] = None,
+        refresh: bool = False,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
         """
         初始化分析器
 
         Args:
             llm_client: LLMClient 实例，需要支持 chat_with_image
+            cache_dir: 分析结果缓存目录（None 表示不缓存）
+            refresh: 跳过缓存读取（新结果仍会写入）
+            max_concurrency: analyze_multiple 同时进行的最大分析数
         """
         self.llm_client = llm_client
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._http = get_default_fetcher()
+        self.cache = ImageAnalysisCache(cache_dir) if cache_dir is not None else None
+        self.refresh = refresh
 
     @staticmethod
     def _is_url(path: str) -> bool:
         """检查路径是否为 URL"""
-        return path.startswith(('http://', 'https://'))
+        return path.startswith(_URL_PREFIXES)
 
     def _download_image(self, url: str) -> tuple[bytes, str]:
         """下载远程图片"""
         parsed = urlparse(url)
         suffix = Path(parsed.path).suffix.lower()
 
-        mime_map = {
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.webp': 'image/webp',
-        }
-
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            image_bytes = resp.read()
-            content_type = resp.headers.get('Content-Type', '')
+        # 共享的 keep-alive 连接池：同一图床的多张图片复用连接，省掉重复的 TCP/TLS 握手
+        image_bytes, content_type = self._http.get(url, timeout=15)
 
         # 从 Content-Type 或 URL 后缀推断 MIME 类型
         if 'jpeg' in content_type or 'jpg' in content_type:
@@ -111,12 +261,12 @@ class ImageAnalyzer:
         elif 'webp' in content_type:
             mime_type = 'image/webp'
         else:
-            mime_type = mime_map.get(suffix, 'image/png')
+            mime_type = self.MIME_BY_SUFFIX.get(suffix, 'image/png')
 
         return image_bytes, mime_type
 
     def _get_image_dimensions_from_bytes(self, image_bytes: bytes) -> tuple[int, int]:
-        """从字节获取图片尺寸"""
+        """从字节获取图片尺寸（Image.open 是惰性的，只解析文件头，不解码像素）"""
         try:
             with Image.open(io.BytesIO(image_bytes)) as img:
                 return img.size
@@ -124,55 +274,82 @@ class ImageAnalyzer:
             logger.warning(f"Failed to get image dimensions from bytes: {e}")
             return (0, 0)
 
-    def _get_image_dimensions(self, image_path: Path) -> tuple[int, int]:
-        """获取图片尺寸"""
+    @staticmethod
+    def _dhash_from_bytes(image_bytes: bytes) -> Optional[int]:
+        """64 位差值哈希（9x8 灰度缩略图中相邻像素的明暗比较）"""
         try:
-            with Image.open(image_path) as img:
-                return img.size
-        except Exception as e:
-            logger.warning(f"Failed to get image dimensions for {image_path}: {e}")
-            return (0, 0)
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                img.draft('L', (64, 64))  # JPEG 直接按缩小尺寸解码
+                # L 模式下 tobytes() 每个像素一个字节
+                pixels = img.convert('L').resize((9, 8), Image.Resampling.BILINEAR).tobytes()
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.debug(f"Failed to hash image: {e}")
+            return None
+        value = 0
+        for row in range(8):
+            offset = row * 9
+            for col in range(8):
+                value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+        return value
+
+    def _cache_scope(self) -> str:
+        config = getattr(self.llm_client, 'config', None)
+        return f"{self.PROMPT_VERSION}|{getattr(config, 'model', '')}"
 
     def _load_image_bytes(self, image_path: Path) -> tuple[bytes, str]:
         """加载图片为字节"""
         image_path = Path(image_path)
         suffix = image_path.suffix.lower()
 
-        mime_map = {
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.webp': 'image/webp',
-        }
-
-        mime_type = mime_map.get(suffix, 'image/png')
+        mime_type = self.MIME_BY_SUFFIX.get(suffix, 'image/png')
 
         with open(image_path, 'rb') as f:
             image_bytes = f.read()
 
         return image_bytes, mime_type
 
-    def analyze(self, image_path: Path, base_dir: Optional[Path] = None) -> ImageAnalysis:
+    def _downscale_for_vlm(self, image_bytes: bytes, mime_type: str, width: int, height: int) -> tuple[bytes, str]:
         """
-        分析单张图片（支持本地文件和远程 URL）
-
-        Args:
-            image_path: 图片路径或 URL
-            base_dir: 基础目录（用于解析相对路径）
+        超过 VLM_MAX_EDGE 的图片缩小后重新编码为 JPEG；GIF（可能是动图）和小图原样返回
 
         Returns:
-            ImageAnalysis 对象
+            (发送给 LLM 的字节, MIME)
+        """
+        if mime_type == 'image/gif' or max(width, height) <= self.VLM_MAX_EDGE:
+            return image_bytes, mime_type
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                box = (self.VLM_MAX_EDGE, self.VLM_MAX_EDGE)
+                img.draft('RGB', box)  # JPEG 按 1/2^n 直接解码到接近目标的尺寸
+                img.thumbnail(box, Image.Resampling.LANCZOS)
+                if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+                    # 透明区域铺白底，避免转 RGB 后变黑
+                    rgba = img.convert('RGBA')
+                    flattened = Image.new('RGB', rgba.size, (255, 255, 255))
+                    flattened.paste(rgba, mask=rgba.getchannel('A'))
+                else:
+                    flattened = img.convert('RGB')
+                buf = io.BytesIO()
+                flattened.save(buf, 'JPEG', quality=self.VLM_JPEG_QUALITY, optimize=True)
+        except Exception as e:
+            logger.warning(f"Failed to downscale image, sending original: {e}")
+            return image_bytes, mime_type
+        return buf.getvalue(), 'image/jpeg'
+
+    def _prepare_image(self, image_path, base_dir: Optional[Path]) -> tuple[str, Optional[bytes], str, int, int]:
+        """
+        加载图片（本地文件或远程 URL），返回 (原路径, 原始字节或 None, MIME, 宽, 高)
+
+        文件只读取一次，尺寸从同一份字节解析。缓存键按原始字节计算；
+        超大图片的缩小（_downscale_for_vlm）留到缓存未命中、真正调用 LLM 之前。
         """
         path_str = str(image_path)
-        is_url = self._is_url(path_str)
 
-        # 加载图片字节
         image_bytes: Optional[bytes] = None
         mime_type = 'image/png'
         width, height = 0, 0
 
-        if is_url:
+        if self._is_url(path_str):
             # 远程图片：下载
             try:
                 image_bytes, mime_type = self._download_image(path_str)
@@ -186,29 +363,133 @@ class ImageAnalyzer:
             if not local_path.is_absolute() and base_dir:
                 local_path = (base_dir / local_path).resolve()
 
-            width, height = self._get_image_dimensions(local_path)
-
             try:
                 image_bytes, mime_type = self._load_image_bytes(local_path)
             except (FileNotFoundError, OSError) as e:
                 logger.warning(f"Image not found: {local_path}: {e}")
+            else:
+                width, height = self._get_image_dimensions_from_bytes(image_bytes)
+
+        return path_str, image_bytes, mime_type, width, height
+
+    @staticmethod
+    def _fallback(path_str: str, description: str, width: int, height: int) -> ImageAnalysis:
+        return ImageAnalysis(
+            path=path_str,
+            description=description,
+            mood='neutral',
+            tags=[],
+            suggested_position='inline',
+            width=width,
+            height=height,
+            aspect_ratio=width / height if height > 0 else 1.0,
+        )
+
+    @staticmethod
+    def _from_data(path_str: str, data: dict, width: int, height: int) -> ImageAnalysis:
+        """把模型返回的字段规范化为 ImageAnalysis"""
+        mood = str(data.get('mood', 'neutral'))
+        if mood not in ('warm', 'cool', 'vibrant', 'neutral'):
+            mood = 'neutral'
+
+        suggested_position = str(data.get('suggested_position', 'inline'))
+        if suggested_position not in ('cover', 'inline', 'ending'):
+            suggested_position = 'inline'
+
+        tags = data.get('tags', [])
+        if not isinstance(tags, list):
+            tags = [str(tags)]
+
+        return ImageAnalysis(
+            path=path_str,
+            description=str(data.get('description', '')),
+            mood=mood,
+            tags=[str(item) for item in tags if str(item).strip()],
+            suggested_position=suggested_position,
+            width=width,
+            height=height,
+            aspect_ratio=width / height if height > 0 else 1.0,
+        )
+
+    def _cache_lookup(self, image_bytes: bytes, mime_type: str) -> tuple[Optional[tuple], Optional[dict]]:
+        """
+        查缓存（精确匹配 -> 感知哈希近似匹配）
+
+        dHash 需要解码图片，只在精确匹配未命中时才计算。
+
+        Returns:
+            (写缓存用的 (key, scope, dhash) 或 None, 命中的字段字典或 None)
+        """
+        if self.cache is None:
+            return None, None
+        scope = self._cache_scope()
+        digest = hashlib.sha256(image_bytes)
+        digest.update(f"|{mime_type}|{scope}".encode("utf-8"))
+        key = digest.hexdigest()
+        dhash = None
+        try:
+            if not self.refresh:
+                cached = self.cache.get_exact(key)
+                if isinstance(cached, dict):
+                    return (key, scope, None), cached
+            dhash = self._dhash_from_bytes(image_bytes)
+            entry = (key, scope, dhash)
+            if self.refresh or dhash is None:
+                return entry, None
+            cached = self.cache.get_similar(scope, dhash)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Image analysis cache read failed: {e}")
+            return (key, scope, dhash), None
+        return entry, cached if isinstance(cached, dict) else None
+
+    def _cache_store(self, entry: Optional[tuple], analysis: ImageAnalysis) -> None:
+        if self.cache is None or entry is None:
+            return
+        try:
+            self.cache.set(*entry, {
+                'description': analysis.description,
+                'mood': analysis.mood,
+                'tags': analysis.tags,
+                'suggested_position': analysis.suggested_position,
+            })
+        except sqlite3.Error as e:
+            logger.warning(f"Image analysis cache write failed: {e}")
 
-        aspect_ratio = width / height if height > 0 else 1.0
+    def analyze(self, image_path: Path, base_dir: Optional[Path] = None) -> ImageAnalysis:
+        """
+        分析单张图片（支持本地文件和远程 URL）
+
+        Args:
+            image_path: 图片路径或 URL
+            base_dir: 基础目录（用于解析相对路径）
+
+        Returns:
+            ImageAnalysis 对象
+        """
+        path_str, image_bytes, mime_type, width, height = self._prepare_image(image_path, base_dir)
 
         # 如果无法加载图片，返回默认分析
         if image_bytes is None:
-            return ImageAnalysis(
-                path=path_str,
-                description="图片无法加载",
-                mood='neutral',
-                tags=[],
-                suggested_position='inline',
-                width=width,
-                height=height,
-                aspect_ratio=aspect_ratio,
-            )
+            return self._fallback(path_str, "图片无法加载", width, height)
+
+        entry, cached = self._cache_lookup(image_bytes, mime_type)
+        if cached is not None:
+            logger.info(f"Image analysis cache hit: {path_str[:60]}")
+            return self._from_data(path_str, cached, width, height)
 
-        # 调用 LLM 分析
+        image_bytes, mime_type = self._downscale_for_vlm(image_bytes, mime_type, width, height)
+        return self._analyze_loaded(path_str, image_bytes, mime_type, width, height, entry)
+
+    def _analyze_loaded(
+        self,
+        path_str: str,
+        image_bytes: bytes,
+        mime_type: str,
+        width: int,
+        height: int,
+        entry: Optional[tuple],
+    ) -> ImageAnalysis:
+        """对已加载的图片单独调用 LLM 分析"""
         try:
             result = self.llm_client.chat_with_image(
                 system_prompt=self.ANALYSIS_SYSTEM_PROMPT,
@@ -219,46 +500,215 @@ class ImageAnalyzer:
                 max_tokens=500,
                 json_mode=True,
             )
+            return self._analysis_from_content(path_str, result.content, width, height, entry)
 
-            analysis_data = self.llm_client.parse_json(result.content, default={})
-            if not isinstance(analysis_data, dict):
-                analysis_data = {}
-
-            mood = str(analysis_data.get('mood', 'neutral'))
-            if mood not in ('warm', 'cool', 'vibrant', 'neutral'):
-                mood = 'neutral'
-
-            suggested_position = str(analysis_data.get('suggested_position', 'inline'))
-            if suggested_position not in ('cover', 'inline', 'ending'):
-                suggested_position = 'inline'
-
-            tags = analysis_data.get('tags', [])
-            if not isinstance(tags, list):
-                tags = [str(tags)]
-
-            return ImageAnalysis(
-                path=path_str,
-                description=str(analysis_data.get('description', '')),
-                mood=mood,
-                tags=[str(item) for item in tags if str(item).strip()],
-                suggested_position=suggested_position,
-                width=width,
-                height=height,
-                aspect_ratio=aspect_ratio,
+        except Exception as e:
+            logger.error(f"Image analysis failed: {e}")
+            return self._fallback(path_str, f"分析出错: {str(e)}", width, height)
+
+    def _analysis_from_content(
+        self,
+        path_str: str,
+        content: str,
+        width: int,
+        height: int,
+        entry: Optional[tuple],
+    ) -> ImageAnalysis:
+        """解析单图分析的模型输出，有效结果写入缓存"""
+        analysis_data = self.llm_client.parse_json(content, default={})
+        if not isinstance(analysis_data, dict):
+            analysis_data = {}
+
+        analysis = self._from_data(path_str, analysis_data, width, height)
+        if self._is_complete(analysis_data):
+            self._cache_store(entry, analysis)
+        return analysis
+
+    async def analyze_async(self, image_path: Path, base_dir: Optional[Path] = None) -> ImageAnalysis:
+        """
+        analyze 的异步版本，供异步调用方（如 Web 接口）使用，不阻塞事件循环
+
+        下载、读文件、PIL 解码与缓存读写放到线程中执行；
+        llm_client 的 chat_with_image 是协程（如 AsyncLLMClient）时直接 await，否则同样放到线程中。
+        """
+        path_str, image_bytes, mime_type, width, height = await asyncio.to_thread(
+            self._prepare_image, image_path, base_dir
+        )
+        if image_bytes is None:
+            return self._fallback(path_str, "图片无法加载", width, height)
+
+        entry, cached = await asyncio.to_thread(self._cache_lookup, image_bytes, mime_type)
+        if cached is not None:
+            logger.info(f"Image analysis cache hit: {path_str[:60]}")
+            return self._from_data(path_str, cached, width, height)
+
+        image_bytes, mime_type = await asyncio.to_thread(
+            self._downscale_for_vlm, image_bytes, mime_type, width, height
+        )
+        chat_with_image = self.llm_client.chat_with_image
+        if not inspect.iscoroutinefunction(chat_with_image):
+            return await asyncio.to_thread(
+                self._analyze_loaded, path_str, image_bytes, mime_type, width, height, entry
             )
 
+        try:
+            result = await chat_with_image(
+                system_prompt=self.ANALYSIS_SYSTEM_PROMPT,
+                user_prompt=self.ANALYSIS_USER_PROMPT,
+                image_bytes=image_bytes,
+                image_mime=mime_type,
+                temperature=0.3,
+                max_tokens=500,
+                json_mode=True,
+            )
+            return await asyncio.to_thread(
+                self._analysis_from_content, path_str, result.content, width, height, entry
+            )
         except Exception as e:
             logger.error(f"Image analysis failed: {e}")
-            return ImageAnalysis(
-                path=path_str,
-                description=f"分析出错: {str(e)}",
-                mood='neutral',
-                tags=[],
-                suggested_position='inline',
-                width=width,
-                height=height,
-                aspect_ratio=aspect_ratio,
-            )
+            return self._fallback(path_str, f"分析出错: {str(e)}", width, height)
+
+    def analyze_batch(
+        self,
+        image_refs: list,
+        base_dir: Optional[Path] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> list[ImageAnalysis]:
+        """
+        批量分析：每次 LLM 调用携带最多 batch_size 张图片，共享一份 system prompt
+
+        缓存命中的图片不进入请求；返回结果缺失或解析失败的图片退回单张分析。
+
+        Args:
+            image_refs: ImageRef 对象列表或路径列表
+            base_dir: 基础目录
+            batch_size: 每次请求的最大图片数
+
+        Returns:
+            ImageAnalysis 对象列表（与输入顺序一致）
+        """
+        if not image_refs:
+            return []
+
+        targets = [self._ref_target(ref) for ref in image_refs]
+        results: list[Optional[ImageAnalysis]] = [None] * len(targets)
+        max_workers = min(self.max_concurrency, len(targets))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            loaded = list(executor.map(lambda target: self._prepare_image(target, base_dir), targets))
+
+            misses: list[tuple[int, Optional[tuple]]] = []
+            for idx, (path_str, image_bytes, mime_type, width, height) in enumerate(loaded):
+                if image_bytes is None:
+                    results[idx] = self._fallback(path_str, "图片无法加载", width, height)
+                    continue
+                entry, cached = self._cache_lookup(image_bytes, mime_type)
+                if cached is not None:
+                    results[idx] = self._from_data(path_str, cached, width, height)
+                    continue
+                misses.append((idx, entry))
+
+            # 只缩小未命中缓存、真正要发给 LLM 的图片
+            def downscale(idx: int) -> tuple[bytes, str]:
+                _, image_bytes, mime_type, width, height = loaded[idx]
+                return self._downscale_for_vlm(image_bytes, mime_type, width, height)
+
+            # 同一请求里的图片共用一个 MIME，按（缩小后的）MIME 分组后再切块
+            pending: dict[str, list[tuple[int, Optional[tuple]]]] = {}
+            scaled = executor.map(downscale, [idx for idx, _ in misses])
+            for (idx, entry), (image_bytes, mime_type) in zip(misses, scaled):
+                path_str, _, _, width, height = loaded[idx]
+                loaded[idx] = (path_str, image_bytes, mime_type, width, height)
+                pending.setdefault(mime_type, []).append((idx, entry))
+
+            size = max(1, int(batch_size))
+            chunks = [
+                (mime_type, items[start:start + size])
+                for mime_type, items in pending.items()
+                for start in range(0, len(items), size)
+            ]
+            for chunk_results in executor.map(lambda chunk: self._analyze_chunk(chunk[0], chunk[1], loaded), chunks):
+                for idx, analysis in chunk_results:
+                    results[idx] = analysis
+
+        return results  # type: ignore[return-value]  # 每个位置都已填充
+
+    def _analyze_chunk(
+        self,
+        mime_type: str,
+        items: list[tuple[int, Optional[tuple]]],
+        loaded: list[tuple[str, Optional[bytes], str, int, int]],
+    ) -> list[tuple[int, ImageAnalysis]]:
+        """一次请求分析一组图片；单张、结果对不上或字段不全的图片走 _analyze_loaded"""
+        by_position: dict[int, dict] = {}
+        if len(items) > 1:
+            try:
+                result = self.llm_client.chat_with_images(
+                    system_prompt=self.BATCH_SYSTEM_PROMPT,
+                    user_prompt=self.BATCH_USER_PROMPT.format(count=len(items)),
+                    images=[loaded[idx][1] for idx, _ in items],
+                    image_mime=mime_type,
+                    temperature=0.3,
+                    max_tokens=400 * len(items),
+                    json_mode=True,
+                )
+                by_position = self._parse_batch(result.content, len(items))
+            except Exception as e:
+                logger.warning(f"Batch image analysis failed, falling back to single calls: {e}")
+
+        analyses = []
+        for position, (idx, entry) in enumerate(items, 1):
+            path_str, image_bytes, _, width, height = loaded[idx]
+            data = by_position.get(position)
+            if self._is_complete(data):
+                analysis = self._from_data(path_str, data, width, height)
+                self._cache_store(entry, analysis)
+            else:
+                analysis = self._analyze_loaded(path_str, image_bytes, mime_type, width, height, entry)
+            logger.info(f"Analyzed image: {path_str[:60]} -> {analysis.mood}, {analysis.suggested_position}")
+            analyses.append((idx, analysis))
+        return analyses
+
+    @staticmethod
+    def _is_complete(data: Optional[dict]) -> bool:
+        """批量结果中的一项是否可用（至少要有描述和合法的 mood，只有 index 的条目不算）"""
+        if not data:
+            return False
+        description = data.get('description')
+        return (
+            isinstance(description, str)
+            and bool(description.strip())
+            and data.get('mood') in ('warm', 'cool', 'vibrant', 'neutral')
+        )
+
+    def _parse_batch(self, content: str, count: int) -> dict[int, dict]:
+        """解析批量结果，按 index（缺失时按顺序）对应到 1..count"""
+        data = self.llm_client.parse_json(content, default={})
+        if isinstance(data, dict):
+            data = data.get('images', [])
+        if not isinstance(data, list):
+            return {}
+
+        items = [item for item in data if isinstance(item, dict)]
+        by_position: dict[int, dict] = {}
+        for position, item in enumerate(items, 1):
+            try:
+                index = int(item.get('index', position))
+            except (TypeError, ValueError):
+                index = position
+            if 1 <= index <= count and index not in by_position:
+                by_position[index] = item
+        return by_position
+
+    @classmethod
+    def _ref_target(cls, ref):
+        """ImageRef / Path / str -> analyze 接受的路径（URL 保持字符串）"""
+        is_url = getattr(ref, 'is_url', None)
+        if is_url is not None:
+            # ImageRef：构造时已判定，无需再扫描前缀
+            return ref.path if is_url else Path(ref.path)
+        path = getattr(ref, 'path', ref)
+        return Path(path) if not cls._is_url(str(path)) else path
 
     def analyze_multiple(
         self,
@@ -275,16 +725,37 @@ class ImageAnalyzer:
         Returns:
             ImageAnalysis 对象列表
         """
-        results = []
-        for ref in image_refs:
-            # 支持 ImageRef 对象和 Path/str
-            if hasattr(ref, 'is_url') and ref.is_url:
-                path = ref.path  # 保持 URL 字符串
-            elif hasattr(ref, 'path'):
-                path = ref.path
-            else:
-                path = ref
-            analysis = self.analyze(Path(path) if not self._is_url(str(path)) else path, base_dir)
-            results.append(analysis)
-            logger.info(f"Analyzed image: {str(path)[:60]} -> {analysis.mood}, {analysis.suggested_position}")
-        return results
+        if not image_refs:
+            return []
+
+        # 下载 + LLM 调用都是网络 I/O，各图片互不依赖，并发执行；map 保持输入顺序
+        max_workers = min(self.max_concurrency, len(image_refs))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda ref: self._analyze_one(ref, base_dir), image_refs))
+
+    async def analyze_multiple_async(
+        self,
+        image_refs: list,
+        base_dir: Optional[Path] = None
+    ) -> list[ImageAnalysis]:
+        """
+        analyze_multiple 的异步版本：协程并发，最多 max_concurrency 张同时进行，结果保持输入顺序
+        """
+        if not image_refs:
+            return []
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def analyze_one(ref) -> ImageAnalysis:
+            async with semaphore:
+                analysis = await self.analyze_async(self._ref_target(ref), base_dir)
+            logger.info(f"Analyzed image: {str(analysis.path)[:60]} -> {analysis.mood}, {analysis.suggested_position}")
+            return analysis
+
+        return list(await asyncio.gather(*(analyze_one(ref) for ref in image_refs)))
+
+    def _analyze_one(self, ref, base_dir: Optional[Path]) -> ImageAnalysis:
+        """分析 analyze_multiple 中的单个引用"""
+        analysis = self.analyze(self._ref_target(ref), base_dir)
+        logger.info(f"Analyzed image: {str(analysis.path)[:60]} -> {analysis.mood}, {analysis.suggested_position}")
+        return analysis
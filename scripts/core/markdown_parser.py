@@ -10,6 +10,7 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass, field
 from enum import Enum
+from itertools import chain
 from pathlib import Path
 from typing import Optional
 
@@ -25,17 +26,20 @@ class BlockType(Enum):
     HORIZONTAL_RULE = "hr"
 
 
-@dataclass
+_URL_PREFIXES = ('http://', 'https://')
+
+
+@dataclass(slots=True)
 class ImageRef:
     """图片引用"""
     alt: str
     path: str
     original_line: str
+    # 是否为远程 URL（构造时确定，path 之后不再修改）
+    is_url: bool = field(init=False, repr=False, compare=False)
 
-    @property
-    def is_url(self) -> bool:
-        """是否为远程 URL"""
-        return self.path.startswith(('http://', 'https://'))
+    def __post_init__(self) -> None:
+        self.is_url = self.path.startswith(_URL_PREFIXES)
 
     def resolve_path(self, base_dir: Path) -> Path:
         """解析图片的绝对路径（仅用于本地文件）"""
@@ -47,7 +51,7 @@ class ImageRef:
         return (base_dir / img_path).resolve()
 
 
-@dataclass
+@dataclass(slots=True)
 class ContentBlock:
     """内容块"""
     type: BlockType
@@ -56,28 +60,49 @@ class ContentBlock:
     language: str = ""  # 用于代码块
     items: list[str] = field(default_factory=list)  # 用于列表
     image_ref: Optional[ImageRef] = None  # 用于图片块
+    # 正文字数（图片块为 0，列表为各项之和）；块在解析后不再修改，构造时算好
+    char_count: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.type == BlockType.IMAGE:
+            self.char_count = 0
+        elif self.type == BlockType.LIST:
+            self.char_count = sum(map(len, self.items))
+        else:
+            self.char_count = len(self.content)
+
+
+def blocks_to_text(blocks: list[ContentBlock]) -> str:
+    """内容块拼成纯文本：跳过图片块，列表逐项成行，其余块取 content，以换行连接"""
+    return "\n".join(chain.from_iterable(
+        block.items if block.type == BlockType.LIST
+        else () if block.type == BlockType.IMAGE
+        else (block.content,)
+        for block in blocks
+    ))
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedMarkdown:
     """解析后的 Markdown 文档"""
     blocks: list[ContentBlock]
     images: list[ImageRef]
     raw_content: str
     source_path: Optional[Path] = None
+    # 各内容块字数之和（即 ContentBlock.char_count 合计，不含换行）
+    total_chars: int = field(init=False, repr=False, compare=False)
+
+    _text_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.total_chars = sum(block.char_count for block in self.blocks)
 
     @property
     def text_content(self) -> str:
-        """获取纯文本内容（不含图片标记）"""
-        texts = []
-        for block in self.blocks:
-            if block.type == BlockType.IMAGE:
-                continue
-            if block.type == BlockType.LIST:
-                texts.extend(block.items)
-            else:
-                texts.append(block.content)
-        return "\n".join(texts)
+        """获取纯文本内容（不含图片标记），首次计算后缓存"""
+        if self._text_cache is None:
+            self._text_cache = blocks_to_text(self.blocks)
+        return self._text_cache
 
     @property
     def char_count(self) -> int:
@@ -100,6 +125,17 @@ class MarkdownParser:
         'horizontal_rule': re.compile(r'^[-*_]{3,}$'),
     }
 
+    # 去除首尾空白后的块起始行：代码块 / 标题 / 分隔线 / 引用，一次匹配完成分类
+    # （与 PATTERNS 中对应模式等价，分支顺序即原来的判断优先级）
+    LINE_RE = re.compile(
+        r'^(?:```(?P<lang>\w*)'
+        r'|(?P<heading>#{1,6})\s+(?P<htext>.+)'
+        r'|(?P<hr>[-*_]{3,})'
+        r'|>\s*(?P<quote>.*))$'
+    )
+    # 原始行上的列表项（保留缩进）：无序 / 有序
+    LIST_RE = re.compile(r'^(\s*)(?:[-*+]\s+(?P<ul>.+)|\d+\.\s+(?P<ol>.+))$')
+
     def __init__(self):
         pass
 
@@ -119,14 +155,15 @@ class MarkdownParser:
                 i += 1
                 continue
 
+            line_match = self.LINE_RE.match(stripped)
+
             # 检查代码块
-            code_match = self.PATTERNS['code_block_start'].match(stripped)
-            if code_match:
-                language = code_match.group(1)
+            if line_match and line_match.group('lang') is not None:
+                language = line_match.group('lang')
                 code_lines = []
                 i += 1
                 while i < len(lines):
-                    if self.PATTERNS['code_block_end'].match(lines[i].strip()):
+                    if lines[i].strip() == '```':
                         i += 1
                         break
                     code_lines.append(lines[i])
@@ -139,10 +176,9 @@ class MarkdownParser:
                 continue
 
             # 检查标题
-            heading_match = self.PATTERNS['heading'].match(stripped)
-            if heading_match:
-                level = len(heading_match.group(1))
-                text = heading_match.group(2).strip()
+            if line_match and line_match.group('heading'):
+                level = len(line_match.group('heading'))
+                text = line_match.group('htext').strip()
                 blocks.append(ContentBlock(
                     type=BlockType.HEADING,
                     content=text,
@@ -151,7 +187,7 @@ class MarkdownParser:
                 i += 1
                 continue
 
-            # 检查图片
+            # 检查图片（行内任意位置，优先于分隔线 / 引用 / 列表）
             image_match = self.PATTERNS['image'].search(stripped)
             if image_match:
                 alt = image_match.group(1)
@@ -167,7 +203,7 @@ class MarkdownParser:
                 continue
 
             # 检查水平分隔线
-            if self.PATTERNS['horizontal_rule'].match(stripped):
+            if line_match and line_match.group('hr'):
                 blocks.append(ContentBlock(
                     type=BlockType.HORIZONTAL_RULE,
                     content='---',
@@ -176,9 +212,8 @@ class MarkdownParser:
                 continue
 
             # 检查引用块
-            quote_match = self.PATTERNS['quote'].match(stripped)
-            if quote_match:
-                quote_lines = [quote_match.group(1)]
+            if line_match:
+                quote_lines = [line_match.group('quote')]
                 i += 1
                 while i < len(lines):
                     qm = self.PATTERNS['quote'].match(lines[i].strip())
@@ -193,11 +228,12 @@ class MarkdownParser:
                 ))
                 continue
 
+            list_match = self.LIST_RE.match(line)
+
             # 检查无序列表
-            ul_match = self.PATTERNS['list_unordered'].match(line)
-            if ul_match:
-                list_items = [ul_match.group(2)]
-                indent_level = len(ul_match.group(1))
+            if list_match and list_match.group('ul') is not None:
+                list_items = [list_match.group('ul')]
+                indent_level = len(list_match.group(1))
                 i += 1
                 while i < len(lines):
                     next_ul = self.PATTERNS['list_unordered'].match(lines[i])
@@ -220,10 +256,9 @@ class MarkdownParser:
                 continue
 
             # 检查有序列表
-            ol_match = self.PATTERNS['list_ordered'].match(line)
-            if ol_match:
-                list_items = [ol_match.group(3)]
-                indent_level = len(ol_match.group(1))
+            if list_match:
+                list_items = [list_match.group('ol')]
+                indent_level = len(list_match.group(1))
                 i += 1
                 while i < len(lines):
                     next_ol = self.PATTERNS['list_ordered'].match(lines[i])
@@ -254,13 +289,9 @@ class MarkdownParser:
                     i += 1
                     break
                 # 检查是否是新的块级元素
-                if (self.PATTERNS['heading'].match(next_line) or
-                    self.PATTERNS['code_block_start'].match(next_line) or
+                if (self.LINE_RE.match(next_line) or
                     self.PATTERNS['image'].search(next_line) or
-                    self.PATTERNS['quote'].match(next_line) or
-                    self.PATTERNS['list_unordered'].match(lines[i]) or
-                    self.PATTERNS['list_ordered'].match(lines[i]) or
-                    self.PATTERNS['horizontal_rule'].match(next_line)):
+                    self.LIST_RE.match(lines[i])):
                     break
                 para_lines.append(next_line)
                 i += 1
@@ -10,67 +10,154 @@ Markdown 文本归一化。
 
 from __future__ import annotations
 
+import functools
+import os
 import re
 
+_CODE_FENCE_RE = re.compile(r"```(?P<lang>[\w+-]*)\n(?P<code>.*?)```", re.S)
+_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\(([^)]+)\)")
+_LINK_RE = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+_INLINE_CODE_RE = re.compile(r"`([^`]+)`")
+_BOLD_AST_RE = re.compile(r"\*\*([^*]+)\*\*")
+_BOLD_UNDER_RE = re.compile(r"__([^_]+)__")
+_ITALIC_AST_RE = re.compile(r"(?<!\*)\*([^*\n]+)\*(?!\*)")
+_ITALIC_UNDER_RE = re.compile(r"(?<!_)_([^_\n]+)_(?!_)")
+_STRIKE_RE = re.compile(r"~~([^~]+)~~")
+_OL_RE = re.compile(r"^\s*\d+[\.)]\s+")
+_WS_RE = re.compile(r"[ \t]{2,}")
+_BRACKET_TAG_RE = re.compile(r"\[([A-Z][A-Z0-9 _:-]{2,})\]")
+
+# 行内规则按顺序执行：(必含的字面量, 模式, 替换)。
+# 当前文本不含某条规则的字面量时它不可能匹配，直接跳过这一遍扫描；
+# 普通行通常一条规则都不用跑。
+_INLINE_PASSES = (
+    ("![", _IMAGE_RE, lambda m: (m.group(1) or "配图").strip()),
+    ("](", _LINK_RE, lambda m: m.group(1).strip()),
+    ("`", _INLINE_CODE_RE, r"\1"),
+    ("**", _BOLD_AST_RE, r"\1"),
+    ("__", _BOLD_UNDER_RE, r"\1"),
+    ("*", _ITALIC_AST_RE, r"\1"),
+    ("_", _ITALIC_UNDER_RE, r"\1"),
+    ("~~", _STRIKE_RE, r"\1"),
+    ("[", _BRACKET_TAG_RE, r"\1"),
+)
+# 输出中反复出现的固定片段，各处共用同一个对象
+_BULLET = "· "
+_CODE_LABEL = "代码片段："
+_CODE_TRUNCATED_NOTE = "（代码较长，已截取关键片段）"
+
+# 每条行内规则都至少需要其中一个字符；一次搜索即可判定整行无需处理
+_MD_CHARS_RE = re.compile(r"[*_`~\[]")
+
+
+
+def _collapse_ws(text: str) -> str:
+    """连续空格 / 制表符压成一个空格并去掉首尾空白；只有制表符参与时才走正则"""
+    if "\t" in text:
+        return _WS_RE.sub(" ", text).strip()
+    # 纯空格的连续段：反复把两个空格换成一个（每轮长度减半），比正则替换快约一倍
+    while "  " in text:
+        text = text.replace("  ", " ")
+    return text.strip()
+
+
+def _normalize_inline(text: str) -> str:
+    if not text:
+        return ""
+
+    normalized = text
+    if _MD_CHARS_RE.search(normalized):
+        for literal, pattern, repl in _INLINE_PASSES:
+            if literal in normalized:
+                normalized = pattern.sub(repl, normalized)
+    return _collapse_ws(normalized)
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_line(line: str) -> str:
+    """
+    单行归一化（纯函数，按原始行缓存）
+
+    同一页文本会被 formatter / renderer 反复归一化，模板化内容里也有大量重复短行，
+    命中时一次字典查找代替多次正则替换。
+    """
+    stripped = line.rstrip()
+    if not stripped:
+        return ""
+
+    # 块前缀按首个非空白字符分派（str.lstrip / isspace 与正则 \s 的空白定义一致）
+    normalized = stripped
+    body = stripped.lstrip()
+    marker = body[0]
+
+    # 普通正文行（中文帖子里占多数）：没有块前缀也没有行内标记，只需整理空白
+    if marker not in "#>-*+" and not marker.isdecimal() and not _MD_CHARS_RE.search(body):
+        return _collapse_ws(body)
+
+    # 标题：1-6 个 # 后跟空白
+    if body[:1] == "#":
+        rest = body.lstrip("#")
+        if len(body) - len(rest) <= 6 and rest[:1].isspace():
+            normalized = body = rest.lstrip()
+
+    # 引用：任意个 >
+    if body[:1] == ">":
+        normalized = body = body.lstrip(">").lstrip()
+
+    # 列表：无序 -*+ 后跟空白；有序（首字符为数字时才跑正则）
+    marker = body[:1]
+    if marker and marker in "-*+":
+        if body[1:2].isspace():
+            normalized = _BULLET + body[1:].lstrip()
+    elif marker.isdecimal():
+        normalized = _OL_RE.sub(_BULLET, normalized)
+
+    return _normalize_inline(normalized)
+
+
+@functools.lru_cache(maxsize=64)
+def _code_label(language: str) -> str:
+    """代码块标题（同一页的代码块通常是同一种语言）"""
+    return f"代码片段（{language}）：" if language else _CODE_LABEL
+
 
 class MarkdownTextNormalizer:
     """Normalize markdown-ish text to readable card text."""
 
+    # 无实例状态：模式与缓存都在模块级
+    __slots__ = ()
+
     MAX_CODE_LINES = 8
     MAX_CODE_LINE_CHARS = 92
-
-    _CODE_FENCE_RE = re.compile(r"```(?P<lang>[\w+-]*)\n(?P<code>.*?)```", re.S)
-    _IMAGE_RE = re.compile(r"!\[([^\]]*)\]\(([^)]+)\)")
-    _LINK_RE = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
-    _INLINE_CODE_RE = re.compile(r"`([^`]+)`")
-    _BOLD_AST_RE = re.compile(r"\*\*([^*]+)\*\*")
-    _BOLD_UNDER_RE = re.compile(r"__([^_]+)__")
-    _ITALIC_AST_RE = re.compile(r"(?<!\*)\*([^*\n]+)\*(?!\*)")
-    _ITALIC_UNDER_RE = re.compile(r"(?<!_)_([^_\n]+)_(?!_)")
-    _STRIKE_RE = re.compile(r"~~([^~]+)~~")
-    _HEADING_RE = re.compile(r"^\s*#{1,6}\s+")
-    _QUOTE_RE = re.compile(r"^\s*>+\s*")
-    _UL_RE = re.compile(r"^\s*[-*+]\s+")
-    _OL_RE = re.compile(r"^\s*\d+[\.)]\s+")
-    _WS_RE = re.compile(r"[ \t]{2,}")
-    _BRACKET_TAG_RE = re.compile(r"\[([A-Z][A-Z0-9 _:-]{2,})\]")
+    # 超长代码块保留的首尾行数（由 MAX_CODE_LINES 推出，类定义时算好）
+    _HEAD_COUNT = max(3, MAX_CODE_LINES - 3)
+    _TAIL_COUNT = 2
+
+    # 覆盖全部规则与分支的样例，用于预热
+    _WARMUP_SAMPLE = (
+        "# 标题 **加粗** __粗__ *斜* _斜_ ~~删~~ [链接](u) ![图](p.png) `代码` [NOTE]\n"
+        "> 引用\n- 列表\t项\n1. 有序  项\n普通正文\n\n"
+        "```py\nprint(1)\n```"
+    )
+
+    @classmethod
+    def warmup(cls) -> None:
+        """
+        预先跑一遍所有路径（正则替换模板编译、各级缓存），把首次调用的开销移出请求路径。
+
+        长驻进程启动时设置 SKILL_MDNORM_WARMUP=1 即在导入本模块时自动执行。
+        """
+        cls().normalize_rich_text(cls._WARMUP_SAMPLE, "\n\n")
 
     def normalize_inline(self, text: str) -> str:
         """Normalize markdown inline syntax in one line."""
-        if not text:
-            return ""
-
-        normalized = text
-        normalized = self._IMAGE_RE.sub(lambda m: (m.group(1) or "配图").strip(), normalized)
-        normalized = self._LINK_RE.sub(lambda m: m.group(1).strip(), normalized)
-        normalized = self._INLINE_CODE_RE.sub(lambda m: m.group(1), normalized)
-        normalized = self._BOLD_AST_RE.sub(lambda m: m.group(1), normalized)
-        normalized = self._BOLD_UNDER_RE.sub(lambda m: m.group(1), normalized)
-        normalized = self._ITALIC_AST_RE.sub(lambda m: m.group(1), normalized)
-        normalized = self._ITALIC_UNDER_RE.sub(lambda m: m.group(1), normalized)
-        normalized = self._STRIKE_RE.sub(lambda m: m.group(1), normalized)
-        normalized = self._BRACKET_TAG_RE.sub(lambda m: m.group(1), normalized)
-        normalized = self._WS_RE.sub(" ", normalized)
-        return normalized.strip()
+        return _normalize_inline(text)
 
     def normalize_line(self, line: str) -> str:
         """Normalize one markdown line (block-prefix + inline)."""
         if not line:
             return ""
-
-        stripped = line.rstrip()
-        if not stripped:
-            return ""
-
-        normalized = self._HEADING_RE.sub("", stripped)
-        normalized = self._QUOTE_RE.sub("", normalized)
-
-        if self._UL_RE.match(normalized):
-            normalized = self._UL_RE.sub("· ", normalized)
-        elif self._OL_RE.match(normalized):
-            normalized = self._OL_RE.sub("· ", normalized)
-
-        return self.normalize_inline(normalized)
+        return _normalize_line(line)
 
     def normalize_multiline(self, text: str) -> str:
         """Normalize multi-line markdown-ish text and keep compact spacing."""
@@ -80,8 +167,7 @@ class MarkdownTextNormalizer:
         output_lines: list[str] = []
         prev_blank = False
 
-        for raw_line in text.splitlines():
-            normalized = self.normalize_line(raw_line)
+        for normalized in map(_normalize_line, text.splitlines()):
             if not normalized:
                 if not prev_blank and output_lines:
                     output_lines.append("")
@@ -98,26 +184,27 @@ class MarkdownTextNormalizer:
 
     def compact_code_block(self, code: str, language: str = "") -> str:
         """Compact long code blocks into readable excerpts."""
-        raw_lines = [(line or "").rstrip() for line in (code or "").splitlines()]
-        lines = [line for line in raw_lines if line.strip()]
+        # 一次遍历：去行尾空白、跳过空行、截断超长行
+        limit = self.MAX_CODE_LINE_CHARS
+        clipped = [
+            line if len(line) <= limit else line[: limit - 1].rstrip() + "…"
+            for line in map(str.rstrip, (code or "").splitlines())
+            if line
+        ]
 
-        if not lines:
-            return "代码片段："
+        if not clipped:
+            return _CODE_LABEL
 
-        clipped = [self._clip_code_line(line) for line in lines]
         truncated = len(clipped) > self.MAX_CODE_LINES
 
         if truncated:
-            head_count = max(3, self.MAX_CODE_LINES - 3)
-            tail_count = 2
-            selected = clipped[:head_count] + ["..."] + clipped[-tail_count:]
+            selected = clipped[:self._HEAD_COUNT] + ["..."] + clipped[-self._TAIL_COUNT:]
         else:
             selected = clipped
 
-        label = f"代码片段（{language}）：" if language else "代码片段："
-        parts = [label, *selected]
+        parts = [_code_label(language), *selected]
         if truncated:
-            parts.append("（代码较长，已截取关键片段）")
+            parts.append(_CODE_TRUNCATED_NOTE)
         return "\n".join(parts)
 
     def normalize_rich_text(self, text: str, block_separator: str) -> str:
@@ -130,19 +217,13 @@ class MarkdownTextNormalizer:
             code = match.group("code") or ""
             return self.compact_code_block(code, language)
 
-        normalized = self._CODE_FENCE_RE.sub(_code_replace, text)
-
-        blocks = normalized.split(block_separator)
-        clean_blocks: list[str] = []
-        for block in blocks:
-            clean = self.normalize_multiline(block)
-            if clean:
-                clean_blocks.append(clean)
+        # 没有围栏时省掉一次整串扫描和中间字符串
+        normalized = _CODE_FENCE_RE.sub(_code_replace, text) if "```" in text else text
 
-        return block_separator.join(clean_blocks)
+        return block_separator.join(
+            filter(None, map(self.normalize_multiline, normalized.split(block_separator)))
+        )
 
-    def _clip_code_line(self, line: str) -> str:
-        if len(line) <= self.MAX_CODE_LINE_CHARS:
-            return line
-        return line[: self.MAX_CODE_LINE_CHARS - 1].rstrip() + "…"
 
+if os.getenv("SKILL_MDNORM_WARMUP", "").strip() == "1":
+    MarkdownTextNormalizer.warmup()
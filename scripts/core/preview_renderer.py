@@ -8,17 +8,28 @@
 
 from __future__ import annotations
 
+import bisect
+import functools
+import hashlib
 import html
+import http.client
 import io
+import itertools
+import json
 import logging
+import os
 import re
-import urllib.request
+import threading
+import urllib.error
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
 from PIL import Image, ImageDraw, ImageFont, UnidentifiedImageError
 
+from .http_fetch import get_default_fetcher
 from .markdown_text_normalizer import MarkdownTextNormalizer
 
 try:
@@ -42,6 +53,9 @@ _EMOJI_RE = re.compile(
     "]+",
 )
 
+# 折行分词：空白 / 英文数字单词（尽量不拆开）/ 其余单字符
+_WRAP_TOKEN_RE = re.compile(r"\s+|[A-Za-z0-9][A-Za-z0-9_./:+#@-]*|.")
+
 
 @dataclass
 class PreviewResult:
@@ -51,6 +65,10 @@ class PreviewResult:
     html_content: str
     width: int
     height: int
+    # 与 image_bytes 内容相同的磁盘文件（渲染缓存命中/写入时设置），保存时可直接复制文件
+    image_path: Optional[Path] = None
+    # 画成“图片加载失败”占位的配图数量；大于 0 时渲染缓存不保存该结果
+    failed_images: int = 0
 
 
 class PreviewRenderer:
@@ -77,6 +95,19 @@ class PreviewRenderer:
     HTML_WIDTH = 420
     HTML_HEIGHT = 560
 
+    # 文本测量 / 折行 / 分块结果缓存上限（条）
+    MEASURE_CACHE_SIZE = 4096
+    WRAP_CACHE_SIZE = 1024
+    SPLIT_CACHE_SIZE = 32
+
+    # 图片预取线程数与已解码图片缓存上限（张）
+    IMAGE_PREFETCH_WORKERS = 4
+    IMAGE_CACHE_SIZE = 16
+    MASK_CACHE_SIZE = 32
+
+    # PNG 是无损格式，quality 参数无效；zlib 3 级压缩接近 1 级的速度，体积与默认 6 级相当
+    PNG_COMPRESS_LEVEL = 3
+
     BLOCK_SEPARATOR = PARAGRAPH_SEPARATOR
 
     HTML_TEMPLATE = """<!DOCTYPE html>
@@ -190,6 +221,26 @@ class PreviewRenderer:
         <div class="rednote-page-num">{page_number} / {total_pages}</div>
     </div>
 </body>
+</html>"""
+
+    # render_pages_to_html 的外壳：整份文档只带一份样式，多张卡片自动换行排列
+    PAGES_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>小红书预览 - 共{total_pages}页</title>
+    <style>{style}
+        body.rednote-pages {{
+            flex-wrap: wrap;
+            align-items: flex-start;
+            gap: 20px;
+        }}
+    </style>
+</head>
+<body class="rednote-pages">
+{cards}
+</body>
 </html>"""
 
     def __init__(
@@ -207,8 +258,22 @@ class PreviewRenderer:
         self._normalizer = MarkdownTextNormalizer()
         self._font_cache: dict[int, ImageFont.FreeTypeFont | ImageFont.ImageFont] = {}
         self._emoji_font_cache: dict[int, ImageFont.FreeTypeFont | None] = {}
+        # 文本宽度与折行结果缓存：键含 id(font)，字体对象在 _font_cache 中常驻，id 不会复用
+        self._measure_cache: dict[tuple[int, str], int] = {}
+        self._wrap_cache: dict[tuple[int, str, int], tuple[str, ...]] = {}
+        self._advance_cache: dict[tuple[int, str], float] = {}
+        self._split_cache: dict[tuple[str, bool], tuple[str, tuple[str, ...]]] = {}
+        self._layout_lock = threading.Lock()
+        # 图片按来源缓存 Future：同一图片只下载 / 解码一次，并发渲染的页面共享同一次加载
+        self._image_cache: dict[tuple, Future] = {}
+        self._image_lock = threading.Lock()
+        self._image_pool: ThreadPoolExecutor | None = None
+        self._http = get_default_fetcher()
+        # 圆角蒙版只与 (宽, 高, 圆角) 有关；paste 只读蒙版，可在页面间复用
+        self._mask_cache: dict[tuple[int, int, int], Image.Image] = {}
 
         vs = visual_style or {}
+        self.visual_style = dict(vs)
         self._card_bg = vs.get("card_bg", "#fffdf9")
         self._text_color = vs.get("text_color", "#333333")
         self._title_color = vs.get("title_color", "#1a1a1a")
@@ -225,16 +290,50 @@ class PreviewRenderer:
         self._img_title = self._hex_to_rgb(self._title_color)
         self._img_accent = self._hex_to_rgb(self._accent_color)
 
+        self._html_shell = self._build_html_shell()
+        self._style_block, self._card_shell = self._split_html_shell(self._html_shell)
+
+    # HTML_TEMPLATE 中随页面变化的字段，其余（样式）字段在构造时一次填好
+    _HTML_PAGE_FIELDS = ("title", "flow_html", "body_class", "title_html", "page_number", "total_pages")
+
+    def _build_html_shell(self) -> str:
+        """预先填好样式字段的 HTML 模板，只留每页字段的占位符"""
+        shell = self.HTML_TEMPLATE.format(
+            **{name: f"\x00{name}\x00" for name in self._HTML_PAGE_FIELDS},
+            html_width=self.HTML_WIDTH,
+            html_height=self.HTML_HEIGHT,
+            card_bg=self._card_bg,
+            text_color=self._text_color,
+            title_color=self._title_color,
+            accent_color=self._accent_color,
+            font_family=self._font_family,
+            border_radius=self._border_radius,
+            shadow=self._shadow,
+        )
+        # 已展开的 CSS 花括号重新转义，再把哨兵还原成占位符，供每页 format 一次
+        shell = shell.replace("{", "{{").replace("}", "}}")
+        for name in self._HTML_PAGE_FIELDS:
+            shell = shell.replace(f"\x00{name}\x00", f"{{{name}}}")
+        return shell
+
+    @staticmethod
+    def _split_html_shell(shell: str) -> tuple[str, str]:
+        """从模板外壳拆出 (样式块, 卡片片段模板)：样式已还原为普通 CSS，卡片片段仍保留每页占位符"""
+        style = shell[shell.index("<style>") + len("<style>"):shell.index("</style>")]
+        card = shell[shell.index("<body>") + len("<body>"):shell.index("</body>")]
+        return style.replace("{{", "{").replace("}}", "}").rstrip(), card.strip("\n")
+
     def set_base_dir(self, base_dir: Path | None) -> None:
         """Update base directory for resolving local image references."""
         self.base_dir = Path(base_dir).resolve() if base_dir else Path.cwd().resolve()
 
     @staticmethod
+    @functools.lru_cache(maxsize=64)
     def _hex_to_rgb(hex_color: str) -> tuple[int, int, int]:
         h = hex_color.lstrip("#")
         if len(h) == 3:
             h = "".join(c * 2 for c in h)
-        return (int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16))
+        return tuple(bytes.fromhex(h[:6]))
 
     def _get_font(self, size: int = FONT_SIZE) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
         if size in self._font_cache:
@@ -295,8 +394,33 @@ class PreviewRenderer:
         return None
 
     @staticmethod
-    def _is_emoji(char: str) -> bool:
-        return bool(_EMOJI_RE.match(char))
+    def _cache_put(cache: dict, key, value, lock: threading.Lock, limit: int) -> None:
+        """写入有界缓存，超出上限时按插入顺序淘汰最早的条目"""
+        with lock:
+            cache[key] = value
+            if len(cache) > limit:
+                del cache[next(iter(cache))]
+
+    def _text_width(self, font: ImageFont.FreeTypeFont | ImageFont.ImageFont, text: str) -> int:
+        """带缓存的 _measure_text：同一段文字在折行和多次渲染中只测量一次"""
+        key = (id(font), text)
+        width = self._measure_cache.get(key)
+        if width is None:
+            width = self._measure_text(font, text)
+            self._cache_put(self._measure_cache, key, width, self._layout_lock, self.MEASURE_CACHE_SIZE)
+        return width
+
+    def _advance(self, font: ImageFont.FreeTypeFont | ImageFont.ImageFont, text: str) -> float:
+        """文本的前进宽度（getlength，比 getbbox 便宜），只用于估算断行位置"""
+        key = (id(font), text)
+        width = self._advance_cache.get(key)
+        if width is None:
+            try:
+                width = font.getlength(text)
+            except AttributeError:
+                width = self._measure_text(font, text)
+            self._cache_put(self._advance_cache, key, width, self._layout_lock, self.MEASURE_CACHE_SIZE)
+        return width
 
     @staticmethod
     def _measure_text(font: ImageFont.FreeTypeFont | ImageFont.ImageFont, text: str) -> int:
@@ -315,13 +439,39 @@ class PreviewRenderer:
         font,
         emoji_font=None,
     ) -> None:
+        if emoji_font is None or _EMOJI_RE.search(text) is None:
+            # 无 emoji：整行一次绘制，FreeType 只排版一次
+            draw.text(xy, text, fill=fill, font=font)
+            return
+
+        # 按 (普通文本, emoji) 分段，每段绘制一次，再按段宽推进
         x, y = xy
-        for char in text:
-            use_font = emoji_font if emoji_font and self._is_emoji(char) else font
-            draw.text((x, y), char, fill=fill, font=use_font)
-            x += self._measure_text(use_font, char)
+        pos = 0
+        for match in _EMOJI_RE.finditer(text):
+            start, end = match.span()
+            if start > pos:
+                x += self._draw_run(draw, (x, y), text[pos:start], fill, font)
+            x += self._draw_run(draw, (x, y), match.group(), fill, emoji_font)
+            pos = end
+        if pos < len(text):
+            self._draw_run(draw, (x, y), text[pos:], fill, font)
+
+    def _draw_run(self, draw: ImageDraw.ImageDraw, xy: tuple[float, int], run: str, fill, font) -> float:
+        """绘制同一字体的一段文本，返回其前进宽度（与折行估算共用宽度缓存）"""
+        draw.text(xy, run, fill=fill, font=font)
+        return self._advance(font, run)
 
     def _wrap_text(self, text: str, max_width: int, font) -> list[str]:
+        key = (id(font), text, max_width)
+        cached = self._wrap_cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        lines = self._wrap_text_uncached(text, max_width, font)
+        self._cache_put(self._wrap_cache, key, tuple(lines), self._layout_lock, self.WRAP_CACHE_SIZE)
+        return lines
+
+    def _wrap_text_uncached(self, text: str, max_width: int, font) -> list[str]:
         lines: list[str] = []
 
         for paragraph in text.split("\n"):
@@ -330,75 +480,132 @@ class PreviewRenderer:
                 lines.append("")
                 continue
 
-            tokens = self._tokenize_for_wrap(paragraph)
-            current_line = ""
-
-            for token in tokens:
-                if token.isspace():
-                    if not current_line:
-                        continue
-                    current_line = self._append_wrapped_token(
-                        lines=lines,
-                        current_line=current_line,
-                        token=" ",
-                        max_width=max_width,
-                        font=font,
-                    )
-                    continue
-
-                current_line = self._append_wrapped_token(
-                    lines=lines,
-                    current_line=current_line,
-                    token=token,
-                    max_width=max_width,
-                    font=font,
-                )
-
-            if current_line:
-                lines.append(current_line.rstrip())
+            self._wrap_paragraph(paragraph, max_width, font, lines)
 
         return lines
 
     @staticmethod
     def _tokenize_for_wrap(paragraph: str) -> list[str]:
         """Tokenize for wrapping: keep words intact when possible."""
-        return re.findall(r"\s+|[A-Za-z0-9][A-Za-z0-9_./:+#@-]*|.", paragraph)
+        return _WRAP_TOKEN_RE.findall(paragraph)
+
+    def _wrap_paragraph(self, paragraph: str, max_width: int, font, lines: list[str]) -> None:
+        """
+        贪心折行：每行尽量多放 token，放不下就换行；单个 token 超宽时按字符切开。
+
+        先用各 token 前进宽度的累加和二分估出断行位置，再用整行实测宽度在估计点两侧确认，
+        每行通常只需实测一两次，而不是每追加一个 token 就把整行重新测一遍。
+        追加字符时包围盒宽度只增不减，因此确认后的断行与逐个试排完全一致。
+        """
+        # 行内空白统一折叠为一个空格
+        tokens = [" " if token.isspace() else token for token in self._tokenize_for_wrap(paragraph)]
+        offsets = [0, *itertools.accumulate(map(len, tokens))]
+        advances = [0.0, *itertools.accumulate(self._advance(font, token) for token in tokens)]
+        joined = "".join(tokens)
+        count = len(tokens)
+
+        head = ""  # 超宽 token 切剩的尾段，作为当前行的开头
+        start = index = 0  # 当前行 = head + tokens[start:index]
+        while index < count:
+            if not head and start == index and tokens[index] == " ":
+                start = index = index + 1
+                continue
 
-    def _append_wrapped_token(
-        self,
-        lines: list[str],
-        current_line: str,
-        token: str,
-        max_width: int,
-        font,
-    ) -> str:
-        test_line = current_line + token
-        if self._measure_text(font, test_line) <= max_width:
-            return test_line
+            line_head, line_begin = head, offsets[start]
+            budget = max_width - self._advance(font, head) + advances[start]
+            end = self._last_fitting(
+                lambda k: self._text_width(font, line_head + joined[line_begin:offsets[k]]) <= max_width,
+                index,
+                count,
+                bisect.bisect_right(advances, budget) - 1,
+            )
+            if end == count:
+                index = count
+                break
 
-        if current_line.strip():
-            lines.append(current_line.rstrip())
-            current_line = ""
+            current_line = head + joined[offsets[start]:offsets[end]]
+            if current_line.strip():
+                lines.append(current_line.rstrip())
 
-        if token.isspace():
-            return ""
+            token = tokens[end]
+            head = ""
+            start = index = end + 1
+            if token == " ":
+                continue
+            if self._text_width(font, token) <= max_width:
+                start = end
+                continue
+            head = self._split_long_token(token, max_width, font, lines)
 
-        if self._measure_text(font, token) <= max_width:
-            return token
+        current_line = head + joined[offsets[start]:offsets[index]]
+        if current_line:
+            lines.append(current_line.rstrip())
 
-        chunk = ""
-        for char in token:
-            test_chunk = chunk + char
-            if not chunk or self._measure_text(font, test_chunk) <= max_width:
-                chunk = test_chunk
-                continue
+    def _split_long_token(self, token: str, max_width: int, font, lines: list[str]) -> str:
+        """把放不进一行的 token 按字符切成整行写入 lines，返回最后不满一行的尾段"""
+        advances = [0.0, *itertools.accumulate(self._advance(font, char) for char in token)]
+        pos = 0
+        while True:
+            # 每段至少一个字符，即使单个字符已超宽
+            chunk_begin = pos
+            end = self._last_fitting(
+                lambda k: self._text_width(font, token[chunk_begin:k]) <= max_width,
+                pos + 1,
+                len(token),
+                bisect.bisect_right(advances, max_width + advances[pos]) - 1,
+            )
+            if end == len(token):
+                return token[pos:]
+            lines.append(token[pos:end].rstrip())
+            pos = end
 
-            lines.append(chunk.rstrip())
-            chunk = char
+    @staticmethod
+    def _last_fitting(fits, lo: int, hi: int, guess: int) -> int:
+        """
+        返回 [lo, hi] 中使 fits 成立的最大值（fits 单调递减，且调用方保证 fits(lo) 成立）
+
+        从估计值 guess 出发：不成立就向下、成立就向上倍增试探，再在夹出的区间内二分。
+        """
+        guess = min(max(guess, lo), hi)
+        step = 1
+        if guess > lo and not fits(guess):
+            hi = guess - 1
+            while lo < hi:
+                probe = max(hi - step + 1, lo + 1)
+                if fits(probe):
+                    lo = probe
+                    break
+                hi = probe - 1
+                step *= 2
+        else:
+            lo = guess
+            while lo < hi:
+                probe = min(lo + step, hi)
+                if not fits(probe):
+                    hi = probe - 1
+                    break
+                lo = probe
+                step *= 2
 
-        return chunk
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if fits(mid):
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
 
     def _split_content_blocks(self, content: str, use_title: bool = True) -> tuple[str, list[str]]:
+        # 同一页在预览迭代、合并 HTML 中会反复渲染，规范化 + 分块结果按原文缓存
+        key = (content, use_title)
+        cached = self._split_cache.get(key)
+        if cached is None:
+            title, blocks = self._split_content_blocks_uncached(content, use_title)
+            cached = (title, tuple(blocks))
+            self._cache_put(self._split_cache, key, cached, self._layout_lock, self.SPLIT_CACHE_SIZE)
+        return cached[0], list(cached[1])
+
+    def _split_content_blocks_uncached(self, content: str, use_title: bool) -> tuple[str, list[str]]:
         normalized_content = self._normalizer.normalize_rich_text(content or "", self.BLOCK_SEPARATOR)
         raw = normalized_content.strip()
         if not raw:
@@ -502,29 +709,103 @@ class PreviewRenderer:
 
         return image_url.replace("\\", "/")
 
+    def _resolve_local_image(self, image_url: str) -> Path | None:
+        if image_url.startswith("/api/images/"):
+            staged_path = (self.base_dir / "api_images" / Path(image_url).name).resolve()
+            if staged_path.exists() and staged_path.is_file():
+                return staged_path
+
+        source_path = Path(image_url)
+        if not source_path.is_absolute():
+            source_path = (self.base_dir / source_path).resolve()
+        if not source_path.exists() or not source_path.is_file():
+            return None
+        return source_path
+
     def _load_image(self, image_url: str) -> Image.Image | None:
         try:
             if image_url.startswith(("http://", "https://")):
-                with urllib.request.urlopen(image_url, timeout=8) as resp:
-                    data = resp.read()
-                return Image.open(io.BytesIO(data)).convert("RGB")
-
-            if image_url.startswith("/api/images/"):
-                staged_path = (self.base_dir / "api_images" / Path(image_url).name).resolve()
-                if staged_path.exists() and staged_path.is_file():
-                    return Image.open(staged_path).convert("RGB")
-
-            source_path = Path(image_url)
-            if not source_path.is_absolute():
-                source_path = (self.base_dir / source_path).resolve()
-            if not source_path.exists() or not source_path.is_file():
+                # 共享的 keep-alive 连接池：同一图床的多张配图复用连接，省掉重复的 TCP/TLS 握手
+                data, _ = self._http.get(image_url, timeout=8)
+                return self._as_rgb(Image.open(io.BytesIO(data)))
+
+            source_path = self._resolve_local_image(image_url)
+            if source_path is None:
                 return None
 
-            return Image.open(source_path).convert("RGB")
-        except (OSError, UnidentifiedImageError, ValueError, urllib.error.URLError) as exc:
+            return self._as_rgb(Image.open(source_path))
+        except (
+            OSError,
+            UnidentifiedImageError,
+            ValueError,
+            urllib.error.URLError,
+            http.client.HTTPException,
+        ) as exc:
             logger.debug(f"Failed to load image {image_url}: {exc}")
             return None
 
+    @staticmethod
+    def _as_rgb(image: Image.Image) -> Image.Image:
+        """解码并转为 RGB；已是 RGB 时直接返回，省掉一次整图拷贝"""
+        image.load()
+        return image if image.mode == "RGB" else image.convert("RGB")
+
+    def _image_cache_key(self, image_url: str) -> tuple:
+        """远程图片按 URL；本地图片按解析后的路径 + mtime/size，文件被替换后自动重新加载"""
+        if image_url.startswith(("http://", "https://")):
+            return ("url", image_url)
+        try:
+            source_path = self._resolve_local_image(image_url)
+            if source_path is not None:
+                stat = source_path.stat()
+                return ("file", str(source_path), stat.st_mtime_ns, stat.st_size)
+        except (OSError, ValueError):
+            pass
+        return ("missing", str(self.base_dir), image_url)
+
+    def _get_image_pool(self) -> ThreadPoolExecutor:
+        with self._image_lock:
+            if self._image_pool is None:
+                self._image_pool = ThreadPoolExecutor(
+                    max_workers=self.IMAGE_PREFETCH_WORKERS,
+                    thread_name_prefix="preview-image",
+                )
+            return self._image_pool
+
+    def _forget_failed_image(self, key: tuple, future: Future) -> None:
+        # 加载失败（网络抖动等）不缓存，下次渲染重新尝试
+        if future.exception() is not None or future.result() is None:
+            with self._image_lock:
+                if self._image_cache.get(key) is future:
+                    del self._image_cache[key]
+
+    def _prefetch_images(self, image_urls: list[str]) -> dict[str, Future]:
+        """
+        提前在线程池中加载图片，返回 {url: Future}
+
+        渲染时只在真正需要某张图片时才阻塞等待，多张图片的下载互相重叠，也与文字排版重叠。
+        """
+        futures: dict[str, Future] = {}
+        pool = None
+        for url in image_urls:
+            if url in futures:
+                continue
+            key = self._image_cache_key(url)
+            with self._image_lock:
+                future = self._image_cache.pop(key, None)
+                if future is not None:
+                    self._image_cache[key] = future  # 移到末尾（最近使用）
+            if future is None:
+                pool = pool or self._get_image_pool()
+                future = pool.submit(self._load_image, url)
+                with self._image_lock:
+                    self._image_cache[key] = future
+                    while len(self._image_cache) > self.IMAGE_CACHE_SIZE:
+                        del self._image_cache[next(iter(self._image_cache))]
+                future.add_done_callback(lambda f, key=key: self._forget_failed_image(key, f))
+            futures[url] = future
+        return futures
+
     @staticmethod
     def _fit_cover_image(image: Image.Image, target_w: int, target_h: int) -> Image.Image:
         src_w, src_h = image.size
@@ -535,7 +816,9 @@ class PreviewRenderer:
         new_w = max(1, int(round(src_w * scale)))
         new_h = max(1, int(round(src_h * scale)))
 
-        resample = Image.Resampling.LANCZOS if hasattr(Image, "Resampling") else Image.LANCZOS
+        # 缩小时 BILINEAR 与 LANCZOS 在卡片尺寸下肉眼难辨，但快得多；放大仍用 LANCZOS
+        resampling = getattr(Image, "Resampling", Image)
+        resample = resampling.LANCZOS if scale > 1.0 else resampling.BILINEAR
         resized = image.resize((new_w, new_h), resample=resample)
 
         left = (new_w - target_w) // 2
@@ -561,7 +844,7 @@ class PreviewRenderer:
 
         placeholder = "图片加载失败"
         font = self._get_font(24)
-        text_w = self._measure_text(font, placeholder)
+        text_w = self._text_width(font, placeholder)
         text_x = x + max(0, (width - text_w) // 2)
         text_y = y + max(0, (height - 24) // 2)
         draw.text((text_x, text_y), placeholder, fill=self._img_accent, font=font)
@@ -575,19 +858,27 @@ class PreviewRenderer:
         y: int,
         width: int,
         height: int,
-    ) -> None:
-        loaded = self._load_image(image_url)
+        pending: Future | None = None,
+    ) -> bool:
+        """绘制配图，返回是否成功加载（失败时画占位）"""
+        loaded = pending.result() if pending is not None else self._load_image(image_url)
         if loaded is None:
             self._draw_image_placeholder(draw, x, y, width, height)
-            return
+            return False
 
         fitted = self._fit_cover_image(loaded, width, height)
-
-        mask = Image.new("L", (width, height), 0)
-        mask_draw = ImageDraw.Draw(mask)
-        mask_draw.rounded_rectangle((0, 0, width, height), radius=self.IMAGE_CORNER, fill=255)
-
-        base_img.paste(fitted, (x, y), mask)
+        base_img.paste(fitted, (x, y), self._rounded_mask(width, height))
+        return True
+
+    def _rounded_mask(self, width: int, height: int) -> Image.Image:
+        key = (width, height, self.IMAGE_CORNER)
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            mask = Image.new("L", (width, height), 0)
+            mask_draw = ImageDraw.Draw(mask)
+            mask_draw.rounded_rectangle((0, 0, width, height), radius=self.IMAGE_CORNER, fill=255)
+            self._cache_put(self._mask_cache, key, mask, self._image_lock, self.MASK_CACHE_SIZE)
+        return mask
 
     def _draw_text_block(
         self,
@@ -638,6 +929,23 @@ class PreviewRenderer:
         total_pages: int = 1,
         use_title: bool = True,
     ) -> bytes:
+        title, flow_items = self._build_flow_items(
+            content,
+            image_urls,
+            image_slots,
+            use_title=use_title,
+        )
+        image_bytes, _ = self._render_image_from_flow(title, flow_items, page_number, total_pages)
+        return image_bytes
+
+    def _render_image_from_flow(
+        self,
+        title: str,
+        flow_items: list[tuple[str, str]],
+        page_number: int,
+        total_pages: int,
+    ) -> tuple[bytes, int]:
+        """绘制卡片，返回 (PNG 字节, 加载失败的配图数)"""
         bg_color = self._img_bg
         text_color = self._img_text
         title_color = self._img_title
@@ -652,12 +960,8 @@ class PreviewRenderer:
         emoji_title_font = self._get_emoji_font(self.TITLE_FONT_SIZE)
 
         content_width = self.width - 2 * self.PADDING_X
-        title, flow_items = self._build_flow_items(
-            content,
-            image_urls,
-            image_slots,
-            use_title=use_title,
-        )
+        pending_images = self._prefetch_images([value for item_type, value in flow_items if item_type == "image"])
+        failed_images = 0
 
         y = self.PADDING_TOP
         max_y = self.height - self.PADDING_BOTTOM - 44
@@ -704,7 +1008,7 @@ class PreviewRenderer:
                 break
 
             image_height = self._estimate_image_height(content_width, available)
-            self._draw_inline_image(
+            if not self._draw_inline_image(
                 base_img=card_img,
                 draw=draw,
                 image_url=value,
@@ -712,12 +1016,14 @@ class PreviewRenderer:
                 y=y,
                 width=content_width,
                 height=image_height,
-            )
+                pending=pending_images.get(value),
+            ):
+                failed_images += 1
             y += image_height + self.BLOCK_GAP
 
         page_text = f"{page_number}/{max(1, total_pages)}"
         small_font = self._get_font(self.PAGE_FONT_SIZE)
-        page_width = self._measure_text(small_font, page_text)
+        page_width = self._text_width(small_font, page_text)
         draw.text(
             (self.width - self.PADDING_X - page_width, self.height - 52),
             page_text,
@@ -726,8 +1032,8 @@ class PreviewRenderer:
         )
 
         buffer = io.BytesIO()
-        card_img.save(buffer, format="PNG", quality=95)
-        return buffer.getvalue()
+        card_img.save(buffer, format="PNG", compress_level=self.PNG_COMPRESS_LEVEL)
+        return buffer.getvalue(), failed_images
 
     def render_to_html(
         self,
@@ -744,7 +1050,34 @@ class PreviewRenderer:
             image_slots,
             use_title=use_title,
         )
+        return self._render_html_from_flow(title, flow_items, page_number, total_pages)
+
+    def _render_html_from_flow(
+        self,
+        title: str,
+        flow_items: list[tuple[str, str]],
+        page_number: int,
+        total_pages: int,
+    ) -> str:
+        return self._html_shell.format(**self._html_page_fields(title, flow_items, page_number, total_pages))
+
+    def _render_card_fragment(
+        self,
+        title: str,
+        flow_items: list[tuple[str, str]],
+        page_number: int,
+        total_pages: int,
+    ) -> str:
+        """单张卡片的 HTML 片段（不含 <style>），供 render_pages_to_html 拼接"""
+        return self._card_shell.format(**self._html_page_fields(title, flow_items, page_number, total_pages))
 
+    def _html_page_fields(
+        self,
+        title: str,
+        flow_items: list[tuple[str, str]],
+        page_number: int,
+        total_pages: int,
+    ) -> dict:
         flow_parts: list[str] = []
         for item_type, value in flow_items:
             if item_type == "text":
@@ -766,23 +1099,47 @@ class PreviewRenderer:
         body_class = "" if title else "no-title"
         title_html = f'<div class="rednote-title">{html.escape(title)}</div>' if title else ""
 
-        return self.HTML_TEMPLATE.format(
-            title=html.escape(title or f"第 {page_number} 页"),
-            flow_html="".join(flow_parts),
-            body_class=body_class,
-            title_html=title_html,
-            page_number=page_number,
-            total_pages=total_pages,
-            html_width=self.HTML_WIDTH,
-            html_height=self.HTML_HEIGHT,
-            card_bg=self._card_bg,
-            text_color=self._text_color,
-            title_color=self._title_color,
-            accent_color=self._accent_color,
-            font_family=self._font_family,
-            border_radius=self._border_radius,
-            shadow=self._shadow,
-        )
+        return {
+            "title": html.escape(title or f"第 {page_number} 页"),
+            "flow_html": "".join(flow_parts),
+            "body_class": body_class,
+            "title_html": title_html,
+            "page_number": page_number,
+            "total_pages": total_pages,
+        }
+
+    def render_pages_to_html(self, pages: list[dict]) -> str:
+        """
+        把多页卡片渲染进同一个 HTML 文档
+
+        与逐页 render_to_html 相比，样式只输出一次，每页只是一个 rednote-card 片段，
+        适合缩略图网格等多页同屏预览。
+
+        Args:
+            pages: 每页一个 dict，键与 render_to_html() 的参数相同；
+                未给出时 page_number 取页序（从 1 开始），total_pages 取 len(pages)
+
+        Returns:
+            完整的 HTML 文档
+        """
+        total = len(pages)
+        cards: list[str] = []
+        for idx, page in enumerate(pages):
+            title, flow_items = self._build_flow_items(
+                page.get("content", ""),
+                page.get("image_urls"),
+                page.get("image_slots"),
+                use_title=page.get("use_title", True),
+            )
+            cards.append(
+                self._render_card_fragment(
+                    title,
+                    flow_items,
+                    page.get("page_number", idx + 1),
+                    page.get("total_pages", total),
+                )
+            )
+        return self.PAGES_HTML_TEMPLATE.format(style=self._style_block, total_pages=total, cards="\n".join(cards))
 
     def render(
         self,
@@ -793,27 +1150,21 @@ class PreviewRenderer:
         total_pages: int = 1,
         use_title: bool = True,
     ) -> PreviewResult:
-        image_bytes = self.render_to_image(
-            content=content,
-            page_number=page_number,
-            image_urls=image_urls,
-            image_slots=image_slots,
-            total_pages=total_pages,
-            use_title=use_title,
-        )
-        html_content = self.render_to_html(
-            content=content,
-            page_number=page_number,
-            image_urls=image_urls,
-            image_slots=image_slots,
-            total_pages=total_pages,
+        # 排版（规范化 + 分块 + 图片插槽）只算一次，图片与 HTML 两种输出共用
+        title, flow_items = self._build_flow_items(
+            content,
+            image_urls,
+            image_slots,
             use_title=use_title,
         )
+        image_bytes, failed_images = self._render_image_from_flow(title, flow_items, page_number, total_pages)
+        html_content = self._render_html_from_flow(title, flow_items, page_number, total_pages)
         return PreviewResult(
             image_bytes=image_bytes,
             html_content=html_content,
             width=self.width,
             height=self.height,
+            failed_images=failed_images,
         )
 
     def save_preview(
@@ -838,7 +1189,15 @@ class PreviewRenderer:
             total_pages=total_pages,
             use_title=use_title,
         )
+        return self._write_preview_files(result, output_dir, prefix, page_number)
 
+    @staticmethod
+    def _write_preview_files(
+        result: PreviewResult,
+        output_dir: Path,
+        prefix: str,
+        page_number: int,
+    ) -> tuple[Path, Path]:
         img_path = output_dir / f"{prefix}_page_{page_number}.png"
         with open(img_path, "wb") as file_obj:
             file_obj.write(result.image_bytes)
@@ -850,6 +1209,59 @@ class PreviewRenderer:
         logger.info(f"Preview saved: {img_path}, {html_path}")
         return img_path, html_path
 
+    def render_batch(
+        self,
+        pages: list[dict],
+        output_dir: Path,
+        prefix: str = "preview",
+        max_workers: Optional[int] = None,
+    ) -> list[tuple[Path, Path]]:
+        """
+        批量渲染并保存多页预览
+
+        各页的排版与 PNG 编码都是 CPU 密集且互不依赖的，按页分给进程池并行；
+        每个工作进程用相同的尺寸 / 字体 / 样式 / base_dir 构造一次渲染器。
+        只有一页、单核或进程池不可用时退回当前进程内逐页渲染。
+
+        Args:
+            pages: 每页一个 dict，键与 render() 的参数相同（content、page_number 等）
+            output_dir: 输出目录
+            prefix: 文件名前缀，与 save_preview 相同
+            max_workers: 进程数上限，默认 CPU 核数
+
+        Returns:
+            与 pages 同序的 (PNG 路径, HTML 路径) 列表
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        results: list[PreviewResult] | None = None
+        workers = min(len(pages), max_workers or os.cpu_count() or 1)
+        if workers > 1:
+            config = {
+                "width": self.width,
+                "height": self.height,
+                "font_path": self.font_path,
+                "base_dir": self.base_dir,
+                "visual_style": self.visual_style,
+            }
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_render_worker,
+                    initargs=(config,),
+                ) as executor:
+                    results = list(executor.map(_render_in_worker, pages))
+            except (OSError, BrokenProcessPool) as exc:
+                logger.warning(f"Process pool unavailable, rendering serially: {exc}")
+        if results is None:
+            results = [self.render(**page) for page in pages]
+
+        return [
+            self._write_preview_files(result, output_dir, prefix, page.get("page_number", 1))
+            for page, result in zip(pages, results)
+        ]
+
     def terminal_preview(self, content: str, page_number: int = 1) -> None:
         try:
             from rich.console import Console
@@ -869,3 +1281,144 @@ class PreviewRenderer:
             print("=" * 40)
             print(content)
             print("=" * 40)
+
+
+# 进程池工作进程内的渲染器（render_batch 使用），由 initializer 构造
+_worker_renderer: PreviewRenderer | None = None
+
+
+def _init_render_worker(config: dict) -> None:
+    global _worker_renderer
+    _worker_renderer = PreviewRenderer(**config)
+    # 预先加载字体，首页渲染不再承担字体查找与加载
+    for size in (PreviewRenderer.FONT_SIZE, PreviewRenderer.TITLE_FONT_SIZE, PreviewRenderer.PAGE_FONT_SIZE):
+        _worker_renderer._get_font(size)
+    _worker_renderer._get_emoji_font(PreviewRenderer.FONT_SIZE)
+    _worker_renderer._get_emoji_font(PreviewRenderer.TITLE_FONT_SIZE)
+
+
+def _render_in_worker(page: dict) -> PreviewResult:
+    return _worker_renderer.render(**page)
+
+
+class CachedPreviewRenderer(PreviewRenderer):
+    """
+    带磁盘缓存的渲染器
+
+    以 (内容, 图片, 标题/页码, 视觉样式, 字体, 渲染器源码 mtime) 的哈希为键，
+    把 PNG 与 HTML 存到 cache_dir；渲染器代码或模板更新后 mtime 变化，旧缓存自然失效。
+    本地图片按 (路径, mtime, 大小) 计入键，替换或新建图片文件后重新渲染；
+    有配图加载失败（画了占位）的结果不写入缓存，下次渲染会重试加载。
+    """
+
+    def __init__(
+        self,
+        *args,
+        cache_dir: Optional[Path] = None,
+        refresh: bool = False,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.refresh = refresh
+        self._style_digest = hashlib.blake2b(
+            json.dumps(self.visual_style, sort_keys=True, ensure_ascii=False).encode("utf-8"),
+            digest_size=16,
+        ).hexdigest()
+        try:
+            self._template_mtime = os.stat(__file__).st_mtime_ns
+        except OSError:
+            self._template_mtime = 0
+
+    def _cache_key(
+        self,
+        content: str,
+        page_number: int,
+        image_urls: list[str] | None,
+        image_slots: list[int] | None,
+        total_pages: int,
+        use_title: bool,
+    ) -> str:
+        parts = [
+            content,
+            json.dumps([self._image_cache_key(url) for url in image_urls or []], ensure_ascii=False),
+            json.dumps(image_slots or []),
+            str(use_title),
+            str(page_number),
+            str(total_pages),
+            f"{self.width}x{self.height}",
+            self.font_path or "",
+            str(self.base_dir),
+            self._style_digest,
+            str(self._template_mtime),
+        ]
+        hasher = hashlib.blake2b(digest_size=32)
+        for part in parts:
+            data = part.encode("utf-8")
+            hasher.update(len(data).to_bytes(8, "little"))
+            hasher.update(data)
+        return hasher.hexdigest()
+
+    def _read_cached(self, key: str) -> PreviewResult | None:
+        img_path = self.cache_dir / f"{key}.png"
+        html_path = self.cache_dir / f"{key}.html"
+        try:
+            image_bytes = img_path.read_bytes()
+            html_content = html_path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+        return PreviewResult(
+            image_bytes=image_bytes,
+            html_content=html_content,
+            width=self.width,
+            height=self.height,
+            image_path=img_path,
+        )
+
+    def _write_cached(self, key: str, result: PreviewResult) -> None:
+        # 先写临时文件再原子替换，避免并发渲染时读到半截文件
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        img_path = self.cache_dir / f"{key}.png"
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            for path, data in (
+                (img_path, result.image_bytes),
+                (self.cache_dir / f"{key}.html", result.html_content.encode("utf-8")),
+            ):
+                tmp_path = path.with_name(path.name + suffix)
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Render cache write failed: {e}")
+            return
+        result.image_path = img_path
+
+    def render(
+        self,
+        content: str,
+        page_number: int = 1,
+        image_urls: list[str] | None = None,
+        image_slots: list[int] | None = None,
+        total_pages: int = 1,
+        use_title: bool = True,
+    ) -> PreviewResult:
+        if self.cache_dir is None:
+            return super().render(
+                content, page_number, image_urls, image_slots, total_pages, use_title
+            )
+
+        key = self._cache_key(content, page_number, image_urls, image_slots, total_pages, use_title)
+        if not self.refresh:
+            cached = self._read_cached(key)
+            if cached is not None:
+                logger.debug("Render cache hit: %s", key[:12])
+                return cached
+
+        result = super().render(
+            content, page_number, image_urls, image_slots, total_pages, use_title
+        )
+        if result.failed_images:
+            logger.debug("Render cache skipped: %d image(s) failed to load", result.failed_images)
+        else:
+            self._write_cached(key, result)
+        return result
@@ -63,6 +63,14 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# 统计 emoji 数量用的字符集（预编译，避免每页重复查正则缓存）
+_EMOJI_COUNT_RE = re.compile('[\U0001F300-\U0001F9FF]')
+
+
+def count_emojis(text: str) -> int:
+    """统计文本中的 emoji 字符数（不构造中间列表）"""
+    return sum(1 for _ in _EMOJI_COUNT_RE.finditer(text))
+
 
 @dataclass
 class FormattedPage:
@@ -245,7 +253,7 @@ class RedNoteFormatter:
             formatted_parts.append(formatted)
 
             # 统计 emoji 数量
-            emoji_count += len(re.findall(r'[\U0001F300-\U0001F9FF]', formatted))
+            emoji_count += count_emojis(formatted)
 
         # 使用盲文空格连接各部分
         content = self.BLOCK_SEPARATOR.join(formatted_parts)
@@ -516,7 +524,7 @@ class RedNoteFormatter:
                     page_number=page.page_number,
                     content=new_content,
                     char_count=len(new_content),
-                    emoji_count=len(re.findall(r'[\U0001F300-\U0001F9FF]', new_content)),
+                    emoji_count=count_emojis(new_content),
                     has_proper_spacing=BRAILLE_BLANK in new_content,
                     image_urls=list(page.image_urls),
                     image_slots=remapped_slots,
@@ -644,7 +652,7 @@ class RedNoteFormatter:
                         page_number=old_page.page_number,
                         content=new_content,
                         char_count=len(new_content),
-                        emoji_count=len(re.findall(r'[\U0001F300-\U0001F9FF]', new_content)),
+                        emoji_count=count_emojis(new_content),
                         has_proper_spacing=BRAILLE_BLANK in new_content,
                         image_urls=list(old_page.image_urls),
                         image_slots=remapped_slots,
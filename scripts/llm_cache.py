@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+LLM 响应缓存
+
+以 (model, prompts, image, 采样参数) 的哈希为键，把 LLM 返回的文本持久化到本地 SQLite。
+同一份 Markdown 反复调试时，重复的视觉审查 / 内容优化调用可以直接命中缓存。
+
+两处使用：
+- CachedLLMClient：智能体视觉反馈阶段的显式缓存（--no-cache 可跳过读取）
+- LLMClient：设置 SKILL_LLM_CACHE_DIR 后，对所有 temperature=0 的请求做精确匹配缓存
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    from .client import ChatResult
+except ImportError:
+    from client import ChatResult
+
+logger = logging.getLogger(__name__)
+
+CACHE_DB_NAME = "responses.sqlite3"
+
+
+def _update_part(hasher: Any, part: str) -> None:
+    data = part.encode("utf-8")
+    hasher.update(len(data).to_bytes(8, "little"))
+    hasher.update(data)
+
+
+@functools.lru_cache(maxsize=32)
+def _prefix_hasher(model: str, system_prompt: str) -> Any:
+    """
+    已吸收 (model, system_prompt) 的哈希状态
+
+    system prompt 都是类常量，每次调用只需 copy() 这个状态，
+    不必反复编码、哈希同一段长文本；得到的键与逐段哈希完全一致。
+    """
+    hasher = hashlib.blake2b(digest_size=32)
+    _update_part(hasher, model)
+    _update_part(hasher, system_prompt)
+    return hasher
+
+
+class LLMResponseCache:
+    """Thread-safe SQLite key/value store for LLM response text."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.cache_dir / CACHE_DB_NAME
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, content TEXT NOT NULL, created_at INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        *,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool,
+        image_bytes: Optional[bytes] = None,
+        image_mime: str = "",
+        images: Optional[list[bytes]] = None,
+    ) -> str:
+        """Build a stable cache key; each part is length-prefixed to avoid ambiguity."""
+        hasher = _prefix_hasher(model, system_prompt).copy()
+        parts = [
+            user_prompt,
+            repr(float(temperature)),
+            str(int(max_tokens)),
+            "json" if json_mode else "text",
+            image_mime,
+        ]
+        for part in parts:
+            _update_part(hasher, part)
+        if image_bytes is not None:
+            hasher.update(len(image_bytes).to_bytes(8, "little"))
+            hasher.update(image_bytes)
+        if images is not None:
+            hasher.update(b"images")
+            hasher.update(len(images).to_bytes(8, "little"))
+            for item in images:
+                hasher.update(len(item).to_bytes(8, "little"))
+                hasher.update(item)
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, content: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, content, created_at) VALUES (?, ?, ?)",
+                (key, content, int(time.time())),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _PendingReply(str):
+    """尚未确认可解析的 JSON 回复：普通字符串，额外带着写缓存用的键"""
+
+    cache_key: str
+
+    def __new__(cls, content: str, cache_key: str) -> "_PendingReply":
+        reply = super().__new__(cls, content)
+        reply.cache_key = cache_key
+        return reply
+
+
+class CachedLLMClient:
+    """
+    LLMClient 包装器：chat_text / chat_with_image / chat_with_images 先查缓存，未命中再调用真实客户端。
+
+    refresh=True 时跳过读取（强制重新生成），但仍会写入新结果。
+    json_mode=True 的结果不立即写入：返回的 content 带着缓存键，调用方经本对象的 parse_json
+    成功解析后才写入，避免把截断 / 格式错误的回复永久缓存下来；纯文本结果直接写入。
+    其余属性（config 等）透传给被包装的客户端。
+    """
+
+    def __init__(self, client: Any, cache: LLMResponseCache, refresh: bool = False):
+        self._client = client
+        self._cache = cache
+        self._refresh = refresh
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def _model_name(self) -> str:
+        config = getattr(self._client, "config", None)
+        return str(getattr(config, "model", ""))
+
+    def _lookup(self, key: str) -> Optional[ChatResult]:
+        if self._refresh:
+            return None
+        try:
+            cached = self._cache.get(key)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+        if cached is None:
+            return None
+        logger.debug("LLM cache hit: %s", key[:12])
+        return ChatResult(content=cached, raw=None)
+
+    def _store(self, key: str, content: str) -> None:
+        try:
+            self._cache.set(key, content)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def _remember(self, key: str, result: ChatResult, json_mode: bool) -> ChatResult:
+        if not json_mode:
+            self._store(key, result.content)
+            return result
+        return ChatResult(content=_PendingReply(result.content, key), raw=result.raw)
+
+    def parse_json(self, content: str, default: Any | None = None) -> Any:
+        """
+        同 LLMClient.parse_json；content 是本对象返回的 JSON 回复且能解析时，写入缓存
+
+        解析失败（返回 default 或抛出 ValueError）的回复不会被缓存，下次仍会重新请求。
+        """
+        key = getattr(content, "cache_key", None)
+        try:
+            data = self._client.parse_json(content)
+        except ValueError:
+            if default is not None:
+                return default
+            raise
+        if key is not None:
+            self._store(key, str(content))
+        return data
+
+    def chat_text(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+        json_mode: bool = False,
+    ) -> ChatResult:
+        key = self._cache.make_key(
+            model=self._model_name(),
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=json_mode,
+        )
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        result = self._client.chat_text(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=json_mode,
+        )
+        return self._remember(key, result, json_mode)
+
+    def chat_with_image(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        image_bytes: bytes,
+        image_mime: str = "image/png",
+        temperature: float = 0.0,
+        max_tokens: int = 1200,
+        json_mode: bool = False,
+    ) -> ChatResult:
+        key = self._cache.make_key(
+            model=self._model_name(),
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=json_mode,
+            image_bytes=image_bytes,
+            image_mime=image_mime,
+        )
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        result = self._client.chat_with_image(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            image_bytes=image_bytes,
+            image_mime=image_mime,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=json_mode,
+        )
+        return self._remember(key, result, json_mode)
+
+    def chat_with_images(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        images: list[bytes],
+        image_mime: str = "image/png",
+        temperature: float = 0.0,
+        max_tokens: int = 1200,
+        json_mode: bool = False,
+    ) -> ChatResult:
+        key = self._cache.make_key(
+            model=self._model_name(),
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=json_mode,
+            image_mime=image_mime,
+            images=images,
+        )
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        result = self._client.chat_with_images(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            images=images,
+            image_mime=image_mime,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=json_mode,
+        )
+        return self._remember(key, result, json_mode)
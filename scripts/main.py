@@ -148,6 +148,9 @@ def main() -> int:
   SKILL_LLM_API_KEY     API 密钥
   SKILL_LLM_BASE_URL    API 端点 (默认: https://api.openai.com/v1)
   SKILL_LLM_MODEL       模型名称 (默认: gpt-4o-mini，建议使用支持视觉的模型)
+  SKILL_LLM_CACHE_DIR   LLM 响应缓存目录 (默认: <输出目录>/.llm_cache；设置后所有 temperature=0 的请求也会缓存)
+  SKILL_LLM_SEMANTIC_CACHE  设为 1 时对 temperature=0 的文本请求启用语义缓存 (需 numpy + sentence-transformers)
+  SKILL_LLM_PROMPT_CACHE    设为 1 时在 Anthropic 兼容端点上把系统提示词与图片标记为可缓存，重复的前缀可命中服务端提示缓存
 """
     )
 
@@ -177,6 +180,12 @@ def main() -> int:
         help='禁用视觉反馈循环 (更快但质量可能较低)'
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='忽略已缓存的图片分析、分页方案、视觉审查/优化结果，强制重新调用 LLM'
+    )
+
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -253,6 +262,7 @@ def main() -> int:
             llm_config=llm_config,
             max_iterations=args.max_iterations,
             output_dir=output_dir,
+            bypass_cache=args.no_cache,
         )
 
         result = agent.convert(
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+语义响应缓存（可选）
+
+对 user_prompt 做本地向量化，若与同一 namespace 下已缓存的提示余弦相似度 >= 阈值，
+直接返回缓存的回复，省掉措辞略有差异的重复调用。
+namespace 由调用方给出，应包含模型、调用参数与 system prompt 的哈希：不同 system prompt 的调用互不匹配。
+
+默认使用多语言句向量模型（本项目的提示词以中文为主）；超出模型输入长度的提示不参与语义匹配，
+否则被截断的长文本只剩开头几百字参与比较，内容不同的页面也会“相似”。
+
+依赖 numpy 与 sentence-transformers（均为可选依赖，未安装时构造会抛出 RuntimeError）。
+仅在设置 SKILL_LLM_SEMANTIC_CACHE=1 时由 LLMClient 对 temperature=0 的纯文本调用启用。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+EMBEDDINGS_FILE = "semantic_embeddings.f32"
+ENTRIES_FILE = "semantic_entries.jsonl"
+
+
+class SemanticCache:
+    """
+    基于句向量的近似匹配缓存
+
+    向量以 float32 行追加写入二进制文件（已归一化，点积即余弦相似度），
+    回复与元数据按行追加到并行的 JSONL 文件中；每次写入只追加一行，不重写已有数据。
+    过期条目在加载时剔除；条目数达到 max_entries 时剔除过期与最旧的条目，两个文件随之重写。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        threshold: float = 0.92,
+        ttl: float = 3600,
+        dim: int = 384,
+        model_name: str = DEFAULT_MODEL_NAME,
+        max_entries: int = 5000,
+    ):
+        try:
+            import numpy as np  # type: ignore
+            from sentence_transformers import SentenceTransformer  # type: ignore
+        except Exception as e:
+            raise RuntimeError(
+                "Missing dependency for semantic cache. Install with: pip install numpy sentence-transformers"
+            ) from e
+
+        self._np = np
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self.ttl = ttl
+        self.dim = dim
+        self.model_name = model_name
+        self.max_entries = max(1, int(max_entries))
+
+        self._model = SentenceTransformer(model_name)
+        self._max_tokens = int(getattr(self._model, "max_seq_length", 0) or 0)
+        self._lock = threading.Lock()
+        # 按容量翻倍增长的数组，前 _count 行有效，避免每次插入都整体拷贝；
+        # 写入时间与 namespace 编号也存成数组，查询时向量化地屏蔽过期 / 其他 namespace 的条目
+        self._matrix = np.zeros((64, dim), dtype=np.float32)
+        self._created = np.zeros(64, dtype=np.float64)
+        self._namespace_ids = np.zeros(64, dtype=np.int32)
+        self._namespaces: dict[str, int] = {}
+        self._count = 0
+        self._entries: list[dict[str, Any]] = []
+        self._load()
+
+    def _load(self) -> None:
+        np = self._np
+        emb_path = self.cache_dir / EMBEDDINGS_FILE
+        entries_path = self.cache_dir / ENTRIES_FILE
+        if not emb_path.exists() or not entries_path.exists():
+            return
+        try:
+            raw = np.fromfile(emb_path, dtype=np.float32)
+            with open(entries_path, "r", encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        except Exception as e:
+            logger.warning(f"Semantic cache load failed, starting empty: {e}")
+            return
+        if raw.size % self.dim:
+            logger.warning("Semantic cache embeddings file is inconsistent, starting empty")
+            return
+        matrix = raw.reshape(-1, self.dim)
+        # 两个文件分别追加，中途中断时以较短的一方为准
+        count = min(len(entries), matrix.shape[0])
+        if any(entry.get("model") != self.model_name for entry in entries[:count]):
+            logger.warning("Semantic cache was built with another embedding model, starting empty")
+            return
+        self._replace_rows(matrix[:count], entries[:count])
+        if self._prune(time.time()) or count != len(entries) or count != matrix.shape[0]:
+            self._rewrite_files()
+
+    def _replace_rows(self, matrix: Any, entries: list[dict[str, Any]]) -> None:
+        np = self._np
+        count = len(entries)
+        capacity = max(64, count * 2)
+        self._matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        self._matrix[:count] = matrix
+        self._created = np.zeros(capacity, dtype=np.float64)
+        self._created[:count] = [entry.get("created_at", 0) for entry in entries]
+        self._namespaces = {}
+        self._namespace_ids = np.zeros(capacity, dtype=np.int32)
+        self._namespace_ids[:count] = [self._namespace_id(entry.get("namespace", "")) for entry in entries]
+        self._count = count
+        self._entries = list(entries)
+
+    def _namespace_id(self, namespace: str) -> int:
+        return self._namespaces.setdefault(namespace, len(self._namespaces))
+
+    def _prune(self, now: float, keep: Optional[int] = None) -> bool:
+        """剔除过期条目，并只保留最新的 keep 条（默认 max_entries）；有剔除时返回 True"""
+        keep = self.max_entries if keep is None else keep
+        alive = self._np.flatnonzero(now - self._created[: self._count] <= self.ttl)
+        alive = alive[max(0, len(alive) - keep):]
+        if len(alive) == self._count:
+            return False
+        self._replace_rows(self._matrix[alive], [self._entries[idx] for idx in alive])
+        return True
+
+    def _rewrite_files(self) -> None:
+        """按当前内存中的条目重写两个文件（先写临时文件再替换）"""
+        emb_path = self.cache_dir / EMBEDDINGS_FILE
+        entries_path = self.cache_dir / ENTRIES_FILE
+        try:
+            emb_tmp = emb_path.with_suffix(emb_path.suffix + ".tmp")
+            entries_tmp = entries_path.with_suffix(entries_path.suffix + ".tmp")
+            self._matrix[: self._count].tofile(emb_tmp)
+            with open(entries_tmp, "w", encoding="utf-8") as f:
+                for entry in self._entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(emb_tmp, emb_path)
+            os.replace(entries_tmp, entries_path)
+        except OSError as e:
+            logger.warning(f"Semantic cache compaction failed: {e}")
+
+    def _fits_model(self, prompt: str) -> bool:
+        """提示是否在模型输入长度内（超长会被截断，向量不能代表全文）"""
+        if not self._max_tokens:
+            return True
+        try:
+            token_count = len(self._model.tokenizer(prompt, add_special_tokens=True)["input_ids"])
+        except Exception:
+            return False
+        return token_count <= self._max_tokens
+
+    def _embed(self, prompt: str) -> Any:
+        vector = self._model.encode(prompt, normalize_embeddings=True)
+        return self._np.asarray(vector, dtype=self._np.float32).reshape(-1)
+
+    def get(self, prompt: str, namespace: str) -> Optional[str]:
+        """
+        查找语义相近的缓存回复
+
+        Args:
+            prompt: 参与比较的提示文本（通常为 user_prompt）
+            namespace: 模型、调用参数与 system prompt 哈希组成的标识，只在同一 namespace 内匹配
+
+        Returns:
+            命中时返回回复文本，否则 None
+        """
+        if not self._fits_model(prompt):
+            return None
+        query = self._embed(prompt)
+        with self._lock:
+            namespace_id = self._namespaces.get(namespace)
+            if not self._count or namespace_id is None:
+                return None
+            count = self._count
+            scores = self._matrix[:count] @ query
+            stale = (self._namespace_ids[:count] != namespace_id) | (time.time() - self._created[:count] > self.ttl)
+            scores[stale] = -1.0
+            best = int(scores.argmax())
+            if float(scores[best]) < self.threshold:
+                return None
+            logger.debug("Semantic cache hit (similarity %.3f)", float(scores[best]))
+            return str(self._entries[best]["content"])
+
+    def set(self, prompt: str, namespace: str, content: str) -> None:
+        if not self._fits_model(prompt):
+            return
+        vector = self._embed(prompt)
+        now = time.time()
+        entry = {
+            "namespace": namespace,
+            "model": self.model_name,
+            "content": content,
+            "created_at": int(now),
+        }
+        with self._lock:
+            if self._count >= self.max_entries:
+                # 压缩到上限的四分之三，之后若干次写入仍只需追加
+                self._prune(now, keep=self.max_entries * 3 // 4)
+                self._rewrite_files()
+            if self._count == self._matrix.shape[0]:
+                self._replace_rows(self._matrix[: self._count], self._entries)
+            idx = self._count
+            self._matrix[idx] = vector
+            self._created[idx] = entry["created_at"]
+            self._namespace_ids[idx] = self._namespace_id(namespace)
+            self._count += 1
+            self._entries.append(entry)
+            try:
+                with open(self.cache_dir / EMBEDDINGS_FILE, "ab") as f:
+                    f.write(vector.tobytes())
+                with open(self.cache_dir / ENTRIES_FILE, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning(f"Semantic cache write failed: {e}")
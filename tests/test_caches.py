@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+from PIL import Image
+
+from scripts.client import ChatResult, LLMClient
+from scripts.config_llm import LLMConfig
+from scripts.llm_cache import CachedLLMClient, LLMResponseCache
+from scripts.core.image_analyzer import ImageAnalysis, ImageAnalysisCache, ImageAnalyzer
+from scripts.core.preview_renderer import CachedPreviewRenderer
+
+
+class RecordingSemanticCache:
+    def __init__(self):
+        self.entries: dict[tuple[str, str], str] = {}
+        self.lookups: list[tuple[str, str]] = []
+
+    def get(self, prompt: str, namespace: str):
+        self.lookups.append((prompt, namespace))
+        return self.entries.get((prompt, namespace))
+
+    def set(self, prompt: str, namespace: str, content: str) -> None:
+        self.entries[(prompt, namespace)] = content
+
+
+def test_semantic_cache_is_scoped_by_system_prompt(monkeypatch):
+    monkeypatch.delenv("SKILL_LLM_CACHE_DIR", raising=False)
+    monkeypatch.delenv("SKILL_LLM_SEMANTIC_CACHE", raising=False)
+    calls: list[str] = []
+
+    def fake_call(self, *, messages, temperature, max_tokens, json_mode):
+        calls.append(messages[0]["content"])
+        return ChatResult(content=f"reply-{len(calls)}")
+
+    monkeypatch.setattr(LLMClient, "_call_with_retry", fake_call)
+    client = LLMClient(LLMConfig(api_key="k", base_url="http://127.0.0.1:9", model="m"))
+    semantic = RecordingSemanticCache()
+    client._semantic_cache = semantic
+
+    first = client.chat_text(system_prompt="优化文案", user_prompt="同一段正文")
+    second = client.chat_text(system_prompt="审查排版", user_prompt="同一段正文")
+    again = client.chat_text(system_prompt="优化文案", user_prompt="同一段正文")
+
+    assert (first.content, second.content, again.content) == ("reply-1", "reply-2", "reply-1")
+    assert len(calls) == 2
+    # 只有 user_prompt 参与向量比较，system prompt 只体现在 namespace 中
+    assert {prompt for prompt, _ in semantic.lookups} == {"同一段正文"}
+    assert len({namespace for _, namespace in semantic.lookups}) == 2
+
+
+def _write_png(path, color, size=(40, 30)):
+    Image.new("RGB", size, color).save(path)
+
+
+def test_render_cache_hit_miss_and_image_invalidation(tmp_path):
+    cache_dir = tmp_path / ".render_cache"
+    renderer = CachedPreviewRenderer(base_dir=tmp_path, cache_dir=cache_dir)
+    page = dict(content="标题\n⠀\n正文", image_urls=["pic.png"], image_slots=[1])
+
+    # 图片缺失：画占位，但结果不进缓存
+    missing = renderer.render(**page)
+    assert missing.failed_images == 1
+    assert not list(cache_dir.glob("*.png"))
+
+    # 图片出现后重新渲染并写入缓存；再次渲染命中缓存
+    _write_png(tmp_path / "pic.png", (200, 30, 30))
+    first = renderer.render(**page)
+    assert first.failed_images == 0
+    assert first.image_bytes != missing.image_bytes
+    assert first.image_path is not None and first.image_path.exists()
+    hit = renderer.render(**page)
+    assert hit.image_bytes == first.image_bytes
+    assert hit.image_path == first.image_path
+
+    # 同一路径换成另一张图：键变化，重新渲染
+    _write_png(tmp_path / "pic.png", (30, 30, 200), size=(60, 30))
+    stat = (tmp_path / "pic.png").stat()
+    os.utime(tmp_path / "pic.png", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    replaced = renderer.render(**page)
+    assert replaced.image_path != first.image_path
+    assert replaced.image_bytes != first.image_bytes
+
+
+def test_forked_child_does_not_reuse_parent_fetcher():
+    from scripts.core import http_fetch
+
+    if not hasattr(os, "fork"):
+        pytest.skip("fork is not available on this platform")
+    parent = http_fetch.get_default_fetcher()
+    pid = os.fork()
+    if pid == 0:
+        # 子进程：共享的下载器已被丢弃，重新获取得到新实例
+        ok = http_fetch._default_fetcher is None and http_fetch.get_default_fetcher() is not parent
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert http_fetch.get_default_fetcher() is parent
+
+
+def test_image_cache_keeps_distinct_near_images_apart(tmp_path, monkeypatch):
+    cache = ImageAnalysisCache(tmp_path)
+    near = 0b1011  # 与 0 的汉明距离为 3，在 PERCEPTUAL_MAX_DISTANCE 之内
+    assert near.bit_count() <= ImageAnalysisCache.PERCEPTUAL_MAX_DISTANCE
+    cache.set("a", "scope", 0, {"description": "猫"})
+    cache.set("b", "scope", near, {"description": "狗"})
+    cache.set("b", "scope", near, {"description": "狗"})
+
+    assert cache.get_exact("a") == {"description": "猫"}
+    assert cache.get_exact("b") == {"description": "狗"}
+    # 近似匹配取距离最近的一条，而不是第一条落在阈值内的
+    assert cache.get_similar("scope", near) == {"description": "狗"}
+    assert cache.get_similar("scope", 0b1) == {"description": "猫"}
+    assert cache.get_similar("other", 0) is None
+    rows = cache._connection().execute("SELECT COUNT(*) FROM similar").fetchone()[0]
+    assert rows == 2
+
+    # 精确命中时不解码图片计算 dHash
+    analyzer = ImageAnalyzer(llm_client=None, cache_dir=tmp_path)
+    hashed: list[bytes] = []
+    monkeypatch.setattr(ImageAnalyzer, "_dhash_from_bytes", staticmethod(lambda data: hashed.append(data) or 5))
+    entry, cached = analyzer._cache_lookup(b"image", "image/png")
+    assert cached is None and hashed == [b"image"]
+    analyzer._cache_store(entry, ImageAnalysis("p", "描述", "warm", [], "inline", 1, 1, 1.0))
+    _, cached = analyzer._cache_lookup(b"image", "image/png")
+    assert cached["description"] == "描述" and hashed == [b"image"]
+
+
+class FakeVisionClient:
+    def __init__(self, batch_content: str):
+        self.batch_content = batch_content
+        self.single_calls = 0
+
+    parse_json = staticmethod(LLMClient.parse_json)
+
+    def chat_with_images(self, **kwargs):
+        return ChatResult(content=self.batch_content)
+
+    def chat_with_image(self, **kwargs):
+        self.single_calls += 1
+        return ChatResult(content='{"description": "单张分析", "mood": "cool", "tags": [], "suggested_position": "inline"}')
+
+
+def test_batch_items_without_fields_fall_back_to_single_analysis(tmp_path):
+    for name, color in (("a.png", (200, 30, 30)), ("b.png", (30, 200, 30))):
+        _write_png(tmp_path / name, color)
+    client = FakeVisionClient('{"images": [{"index": 1}, {"index": 2, "description": "绿色", "mood": "vibrant"}]}')
+    analyzer = ImageAnalyzer(llm_client=client, cache_dir=tmp_path / "cache")
+
+    first, second = analyzer.analyze_batch(["a.png", "b.png"], base_dir=tmp_path)
+
+    assert client.single_calls == 1
+    assert (first.description, first.mood) == ("单张分析", "cool")
+    assert (second.description, second.mood) == ("绿色", "vibrant")
+
+
+class FakeJsonClient:
+    def __init__(self, replies: list[str]):
+        self.replies = replies
+        self.calls = 0
+
+    parse_json = staticmethod(LLMClient.parse_json)
+
+    def chat_text(self, **kwargs):
+        self.calls += 1
+        return ChatResult(content=self.replies[self.calls - 1])
+
+
+def test_cached_client_stores_json_only_after_it_parses(tmp_path):
+    inner = FakeJsonClient(['{"score": ', '{"score": 8}'])
+    client = CachedLLMClient(inner, LLMResponseCache(tmp_path))
+    request = dict(system_prompt="审查", user_prompt="第 1 页", json_mode=True)
+
+    truncated = client.chat_text(**request)
+    assert client.parse_json(truncated.content, default={}) == {}
+    complete = client.chat_text(**request)
+    assert inner.calls == 2
+    assert client.parse_json(complete.content, default={}) == {"score": 8}
+
+    cached = client.chat_text(**request)
+    assert inner.calls == 2
+    assert cached.content == '{"score": 8}'
+
+
+def test_image_cache_hit_skips_downscale(tmp_path, monkeypatch):
+    _write_png(tmp_path / "big.png", (120, 80, 40), size=(1600, 1200))
+    client = FakeVisionClient("{}")
+    analyzer = ImageAnalyzer(llm_client=client, cache_dir=tmp_path / "cache")
+    sent: list[str] = []
+    original = ImageAnalyzer._downscale_for_vlm
+
+    def recording(self, image_bytes, mime_type, width, height):
+        image_bytes, mime_type = original(self, image_bytes, mime_type, width, height)
+        sent.append(mime_type)
+        return image_bytes, mime_type
+
+    monkeypatch.setattr(ImageAnalyzer, "_downscale_for_vlm", recording)
+
+    first = analyzer.analyze("big.png", base_dir=tmp_path)
+    assert sent == ["image/jpeg"] and client.single_calls == 1
+    # 命中缓存：不再缩小 / 重新编码，也不调用 LLM；尺寸仍是原图
+    again = analyzer.analyze("big.png", base_dir=tmp_path)
+    assert sent == ["image/jpeg"] and client.single_calls == 1
+    assert (again.description, again.width, again.height) == (first.description, 1600, 1200)
+    (batch,) = analyzer.analyze_batch(["big.png"], base_dir=tmp_path)
+    assert sent == ["image/jpeg"] and batch.description == first.description
+
+
+def test_cached_client_stores_identical_replies_under_each_key(tmp_path):
+    inner = FakeJsonClient(['{"score": 8}'] * 4)
+    client = CachedLLMClient(inner, LLMResponseCache(tmp_path))
+    pages = [dict(system_prompt="审查", user_prompt=f"第 {n} 页", json_mode=True) for n in (1, 2, 3)]
+
+    replies = [client.chat_text(**page) for page in pages]
+    # 第 3 页的回复从未被解析：不写入缓存，也不在客户端里留下任何状态
+    for reply in replies[:2]:
+        assert client.parse_json(reply.content) == {"score": 8}
+    assert inner.calls == 3
+
+    assert [client.chat_text(**page).content for page in pages[:2]] == ['{"score": 8}'] * 2
+    assert inner.calls == 3
+    client.chat_text(**pages[2])
+    assert inner.calls == 4
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import pytest
+
+from scripts.client import LLMClient
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        ('{"score": 8}', {"score": 8}),
+        ('思考 {先量一下 5" 宽度} 结论: {"score": 8}', {"score": 8}),
+        ('Note {the 27" monitor} -> {"score": 8, "issues": []}', {"score": 8, "issues": []}),
+        ('Note {the 27" monitor}\n```json\n{"score": 8}\n```', {"score": 8}),
+        ('前言 {"a": "x {"} 然后 {"score": 8}', {"a": "x {"}),
+        ('{"reviews": [{"page": 1, "issues": ["引号 \\"太多\\""]}]}', {"reviews": [{"page": 1, "issues": ['引号 "太多"']}]}),
+        ('只有数组 [1, 2, "]"] 结束', [1, 2, "]"]),
+    ],
+)
+def test_parse_json_recovers_after_stray_quotes(content, expected):
+    assert LLMClient.parse_json(content) == expected
+
+
+def test_parse_json_unrecoverable_reply_uses_default():
+    assert LLMClient.parse_json('没有 JSON, 只有 5" 和 {未闭合', default={}) == {}
+    with pytest.raises(ValueError):
+        LLMClient.parse_json('没有 JSON, 只有 5" 和 {未闭合')
@@ -8,12 +8,11 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 import html
-import re
 from pathlib import Path
 
 from scripts.constants.rednote_chars import BRAILLE_BLANK, PARAGRAPH_SEPARATOR
 from scripts.core.preview_renderer import PreviewRenderer, PreviewResult
-from scripts.core.rednote_formatter import FormattedPage
+from scripts.core.rednote_formatter import FormattedPage, count_emojis
 
 
 ALLOWED_BLOCK_TYPES = {"title", "text", "image"}
@@ -284,7 +283,7 @@ def story_to_formatted_pages(story: dict) -> list[FormattedPage]:
                 page_number=page_number,
                 content=content,
                 char_count=len(content),
-                emoji_count=len(re.findall(r"[\U0001F300-\U0001F9FF]", content)),
+                emoji_count=count_emojis(content),
                 has_proper_spacing=BRAILLE_BLANK in content,
                 image_urls=image_urls,
                 image_slots=image_slots,